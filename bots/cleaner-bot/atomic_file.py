@@ -0,0 +1,13 @@
+import json
+import os
+
+
+def write_json(path, data, **dump_args):
+    """Write ``data`` as JSON to ``path`` so a crash leaves the old file or
+    the new one, never half of either: temp file, fsync, atomic rename."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, **dump_args)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
@@ -0,0 +1,188 @@
+"""Command throughput benchmark for chore_bot, with no Discord connection.
+
+Builds synthetic messages, parses them with the real bot
+(``bot.get_context``) and runs them through ``bot.invoke``, so prefix
+parsing, converters, invoke hooks, the transaction pipeline and the points
+store all run as in production. Only ctx.send and the router are faked.
+
+    python bench/bench_commands.py
+    python bench/bench_commands.py --users 5000 --commands 50000 --backend sqlite
+    python bench/bench_commands.py --mix finish=5,spend=1,total=4 --router-latency 0.5
+
+Runs in a scratch directory, so real points files are never touched.
+Reports throughput, per-command latency and event-loop lag.
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+BOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BOT_DIR)
+
+from discord.ext import commands  # noqa: E402
+
+from metrics import Histogram  # noqa: E402
+
+
+DEFAULT_MIX = "finish=40,lf=10,spend=10,total=35,list=5"
+
+
+class BenchContext(commands.Context):
+    """Context whose replies are counted instead of sent."""
+
+    sent = 0
+
+    async def send(self, content=None, **kwargs):
+        BenchContext.sent += 1
+
+
+class FakeChannel:
+    def __init__(self, channel_id):
+        self.id = channel_id
+
+    async def send(self, content=None, **kwargs):
+        BenchContext.sent += 1
+
+
+def make_message(message_id, user_id, content, channel):
+    author = SimpleNamespace(
+        id=user_id, name=f"user{user_id}", mention=f"<@{user_id}>", bot=False,
+    )
+    return SimpleNamespace(id=message_id, content=content, author=author,
+                           channel=channel, guild=None, attachments=[], _state=None)
+
+
+def command_text(name, rng):
+    if name == "finish":
+        return f"!finish {rng.choice(['sweep', 'scoop', 'laundry', 'mop', 'swe', 'study 30'])}"
+    if name == "lf":
+        return f"!lf {rng.choice(['code', 'leetcode', 'cardio'])}"
+    if name == "spend":
+        return f"!spend {rng.randint(1, 20)}"
+    return f"!{name}"
+
+
+def parse_mix(spec):
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+async def measure_loop_lag(samples, stop, interval=0.01):
+    """Record how late a 10 ms sleep wakes up while the load runs."""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, loop.time() - expected))
+
+
+async def run(chore_bot, args):
+    rng = random.Random(args.seed)
+    bot = chore_bot.create_bot()
+    # get_context compares the author with the bot's own user
+    bot._connection.user = SimpleNamespace(id=0)
+
+    async def fake_toggle(state):
+        if args.router_latency:
+            await asyncio.sleep(args.router_latency)
+        return True
+
+    chore_bot.async_wifi_control = fake_toggle
+
+    # Give everyone a starting balance so spends mostly succeed
+    for user_id in range(1, args.users + 1):
+        chore_bot.app.store.balances[str(user_id)] = 500
+
+    mix = parse_mix(args.mix)
+    names, weights = list(mix), list(mix.values())
+    channel = FakeChannel(1)
+    message_ids = itertools.count(1)
+    latencies = {name: Histogram() for name in names}
+    lag = []
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(measure_loop_lag(lag, stop))
+    remaining = itertools.repeat(None, args.commands)
+
+    async def worker():
+        # Each worker is one chatty client: send, wait for the reply, repeat
+        for _ in remaining:
+            name = rng.choices(names, weights)[0]
+            user_id = rng.randint(1, args.users)
+            message = make_message(next(message_ids), user_id, command_text(name, rng), channel)
+
+            started = time.perf_counter()
+            ctx = await bot.get_context(message, cls=BenchContext)
+            await bot.invoke(ctx)
+            latencies[name].observe(time.perf_counter() - started)
+
+            # A real gateway read yields between messages
+            await asyncio.sleep(0)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await lag_task
+    await chore_bot.app.close()
+
+    lag_histogram = Histogram()
+    for sample in lag:
+        lag_histogram.observe(sample)
+    return elapsed, latencies, lag_histogram
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--commands", type=int, default=10000)
+    parser.add_argument("--concurrency", type=int, default=100,
+                        help="simulated clients, each with one command in flight")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="command=weight list")
+    parser.add_argument("--backend", choices=["ledger", "sqlite"], default="ledger")
+    parser.add_argument("--router-latency", type=float, default=0.0,
+                        help="seconds a faked WiFi toggle takes")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="chore-bench-")
+    for name in ("catalog.json", "reset_config.json"):
+        shutil.copy(os.path.join(BOT_DIR, name), workdir)
+    os.chdir(workdir)
+    os.environ["POINTS_BACKEND"] = args.backend
+
+    try:
+        import_started = time.perf_counter()
+        import chore_bot
+        import_time = time.perf_counter() - import_started
+
+        elapsed, latencies, lag = asyncio.run(run(chore_bot, args))
+    finally:
+        os.chdir(BOT_DIR)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"backend={args.backend} users={args.users} commands={args.commands} "
+          f"concurrency={args.concurrency} (import {1000 * import_time:.0f} ms)\n")
+    print(f"throughput: {args.commands / elapsed:,.0f} commands/s "
+          f"({elapsed:.2f}s, {BenchContext.sent} replies)\n")
+    print(f"{'command':<10}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for name, histogram in latencies.items():
+        row = histogram.summary()
+        print(f"{name:<10}{row['count']:>8}{row['p50_ms']:>10}{row['p95_ms']:>10}"
+              f"{row['p99_ms']:>10}{row['max_ms']:>10}")
+    row = lag.summary()
+    print(f"\nevent-loop lag: p50={row['p50_ms']} ms  p99={row['p99_ms']} ms  max={row['max_ms']} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""End-to-end WiFi toggle benchmarks against local fake routers.
+
+Runs offline:
+
+    python bench/bench_router.py
+    python bench/bench_router.py --routers 3 --latency 0.1 --failure-rate 0.05
+
+Measures
+  * toggle latency through RouterGroup (set_wifi + status polling),
+  * throughput of concurrent !spend/!wifi style requests through the
+    RouterWorker queue, and how many reached the router after coalescing,
+  * recovery time of the first toggle after every session expired.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tplinkrouterc6u import Connection  # noqa: E402
+
+from router import RouterGroup, RouterSession, RouterWorker  # noqa: E402
+from fake_router import FakeRouterClient, FakeRouterServer  # noqa: E402
+
+
+def percentile(samples, p):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+def report(name, samples):
+    print(
+        f"{name:<28} n={len(samples):<5} "
+        f"p50={1000 * percentile(samples, 50):8.1f} ms  "
+        f"p95={1000 * percentile(samples, 95):8.1f} ms  "
+        f"max={1000 * max(samples):8.1f} ms"
+    )
+
+
+def build_group(servers, bands):
+    targets = {}
+    for server in servers:
+        session = RouterSession(server.host, server.password, client_factory=FakeRouterClient)
+        targets[session] = bands
+    return RouterGroup(targets)
+
+
+def bench_toggle_latency(servers, bands, toggles):
+    group = build_group(servers, bands)
+    samples = []
+    failures = 0
+    try:
+        for i in range(toggles):
+            started = time.perf_counter()
+            results = group.toggle(i % 2 == 0)
+            samples.append(time.perf_counter() - started)
+            failures += sum(result != "ok" for result in results.values())
+    finally:
+        group.close()
+
+    report("toggle latency", samples)
+    print(f"{'':<28} failed targets: {failures}")
+
+
+async def bench_concurrent_commands(servers, bands, commands, concurrency):
+    group = build_group(servers, bands)
+    worker = RouterWorker(lambda state: all(r == "ok" for r in group.toggle(state).values()))
+    toggles_before = sum(server.requests["wifi"] for server in servers)
+    latencies = []
+
+    async def command():
+        # !spend turns WiFi on, an admin !wifi off turns it off
+        state = random.random() < 0.8
+        started = time.perf_counter()
+        await worker.set_wifi(state)
+        latencies.append(time.perf_counter() - started)
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited():
+        async with semaphore:
+            await command()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(limited() for _ in range(commands)))
+    elapsed = time.perf_counter() - started
+    await worker.stop()
+    await asyncio.get_running_loop().run_in_executor(None, group.close)
+
+    router_toggles = (sum(server.requests["wifi"] for server in servers) - toggles_before) // (
+        len(servers) * len(bands)
+    )
+    report("concurrent command wait", latencies)
+    print(
+        f"{'':<28} {commands} commands in {elapsed:.2f}s "
+        f"({commands / elapsed:.1f}/s), {router_toggles} router toggles after coalescing"
+    )
+
+
+def bench_session_recovery(servers, bands, rounds):
+    group = build_group(servers, bands)
+    steady, recovery = [], []
+    try:
+        group.toggle(True)  # log in once
+        for i in range(rounds):
+            started = time.perf_counter()
+            group.toggle(i % 2 == 0)
+            steady.append(time.perf_counter() - started)
+
+            for server in servers:
+                server.expire_sessions()
+            started = time.perf_counter()
+            group.toggle(i % 2 == 1)
+            recovery.append(time.perf_counter() - started)
+    finally:
+        group.close()
+
+    report("toggle, live session", steady)
+    report("toggle after expiry", recovery)
+    print(f"{'':<28} re-login overhead p50: "
+          f"{1000 * (statistics.median(recovery) - statistics.median(steady)):.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--routers", type=int, default=2)
+    parser.add_argument("--bands", default="guest_2g,guest_5g")
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds per router request")
+    parser.add_argument("--jitter", type=float, default=0.01)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--apply-delay", type=float, default=0.1,
+                        help="seconds before a toggle shows up in status")
+    parser.add_argument("--toggles", type=int, default=10)
+    parser.add_argument("--commands", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    # Expired-session retries log warnings by design; keep the report readable
+    logging.basicConfig(level=logging.ERROR)
+    bands = [Connection(band.strip()) for band in args.bands.split(",")]
+    servers = [
+        FakeRouterServer(
+            latency=args.latency, jitter=args.jitter, failure_rate=args.failure_rate,
+            apply_delay=args.apply_delay,
+        ).start()
+        for _ in range(args.routers)
+    ]
+    print(f"{args.routers} fake router(s), bands {args.bands}, "
+          f"{1000 * args.latency:.0f} ms/request, failure rate {args.failure_rate:.0%}\n")
+
+    try:
+        bench_toggle_latency(servers, bands, args.toggles)
+        asyncio.run(bench_concurrent_commands(servers, bands, args.commands, args.concurrency))
+        bench_session_recovery(servers, bands, max(1, args.toggles // 4))
+    finally:
+        for server in servers:
+            server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Cold-start benchmark for chore_bot.
+
+Every run is a fresh interpreter in a scratch directory, timing
+
+  * ``import chore_bot`` (all of discord.py included),
+  * ``create_bot()`` (building the bot and registering every command),
+  * opening the points store, the first thing the bot does on startup,
+
+and checking that import + create_bot wrote no files and did not load the
+router library.
+
+    python bench/bench_startup.py
+    python bench/bench_startup.py --runs 20 --users 50000 --backend sqlite
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import json, os, sys, time
+sys.path.insert(0, sys.argv[1])
+
+started = time.perf_counter()
+import chore_bot
+imported = time.perf_counter()
+chore_bot.create_bot()
+created = time.perf_counter()
+files = sorted(os.listdir("."))
+router_loaded = "tplinkrouterc6u" in sys.modules
+chore_bot.app.store
+opened = time.perf_counter()
+chore_bot.app.store.close()
+
+print(json.dumps({
+    "import": imported - started,
+    "create_bot": created - imported,
+    "open_store": opened - created,
+    "files": files,
+    "router_loaded": router_loaded,
+}))
+"""
+
+
+def seed_points(workdir, backend, users):
+    """Write a points file (or database) with ``users`` balances."""
+    balances = {str(user_id): user_id % 500 for user_id in range(1, users + 1)}
+    env = dict(os.environ, POINTS_BACKEND=backend)
+    seed = (
+        "import sys; sys.path.insert(0, sys.argv[1]); import json, chore_bot\n"
+        "store = chore_bot.app.store\n"
+        "store.replace(json.load(open('seed.json')))\n"
+        "store.close()\n"
+    )
+    with open(os.path.join(workdir, "seed.json"), "w", encoding="utf-8") as f:
+        json.dump(balances, f)
+    subprocess.run([sys.executable, "-c", seed, BOT_DIR], cwd=workdir, env=env, check=True)
+    os.remove(os.path.join(workdir, "seed.json"))
+
+
+def run_once(workdir, backend):
+    env = dict(os.environ, POINTS_BACKEND=backend)
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD, BOT_DIR],
+        cwd=workdir, env=env, check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--users", type=int, default=1000, help="balances in the seeded points store")
+    parser.add_argument("--backend", choices=["ledger", "sqlite"], default="ledger")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="chore-startup-")
+    try:
+        for name in ("catalog.json", "reset_config.json"):
+            shutil.copy(os.path.join(BOT_DIR, name), workdir)
+        seed_points(workdir, args.backend, args.users)
+        before = sorted(os.listdir(workdir))
+
+        run_once(workdir, args.backend)  # warm the OS file cache and .pyc files
+        runs = [run_once(workdir, args.backend) for _ in range(args.runs)]
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"backend={args.backend} users={args.users} runs={args.runs}\n")
+    for step in ("import", "create_bot", "open_store"):
+        samples = [run[step] for run in runs]
+        print(f"{step:<12} median={1000 * statistics.median(samples):7.1f} ms  "
+              f"max={1000 * max(samples):7.1f} ms")
+
+    created = sorted({name for run in runs for name in run["files"]} - set(before))
+    print(f"\nfiles written before the store opens: {', '.join(created) or 'none'}")
+    print(f"router library loaded at startup: {'yes' if any(run['router_loaded'] for run in runs) else 'no'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""Local stand-in for a TP-Link router, for benchmarks and offline testing.
+
+FakeRouterServer speaks a small JSON-over-HTTP version of the three calls
+the bot makes through tplinkrouterc6u (login, set_wifi, status, plus
+logout), with configurable latency, failure rate, session lifetime and
+state-convergence delay. FakeRouterClient has the same authorize /
+set_wifi / get_status / logout interface as the real clients, so it can be
+passed to RouterSession as ``client_factory``.
+"""
+import json
+import random
+import secrets
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from tplinkrouterc6u import Connection
+from tplinkrouterc6u.common.dataclass import Status
+
+from router import status_field
+
+
+class FakeRouterServer:
+    """Threaded HTTP server emulating one router.
+
+    latency: seconds added to every request (plus up to ``jitter`` more)
+    failure_rate: chance that a request answers HTTP 500
+    session_ttl: seconds a login token stays valid
+    apply_delay: seconds before a set_wifi change shows up in status
+    """
+
+    def __init__(self, latency=0.05, jitter=0.0, failure_rate=0.0,
+                 session_ttl=600.0, apply_delay=0.0, password="admin"):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.session_ttl = session_ttl
+        self.apply_delay = apply_delay
+        self.password = password
+
+        self.requests = {"login": 0, "wifi": 0, "status": 0, "logout": 0}
+        self._tokens = {}
+        self._bands = {}
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._thread = None
+
+    @property
+    def host(self):
+        return f"127.0.0.1:{self._httpd.server_address[1]}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def expire_sessions(self):
+        """Invalidate every login, as a router reboot or timeout would."""
+        with self._lock:
+            self._tokens.clear()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # ---------------------------
+    # Request handling
+    # ---------------------------
+
+    def _handle(self, route, token, body):
+        """Returns (status code, response dict)."""
+        time.sleep(self.latency + random.uniform(0, self.jitter))
+        with self._lock:
+            self.requests[route] = self.requests.get(route, 0) + 1
+        if random.random() < self.failure_rate:
+            return 500, {"error": "internal error"}
+
+        now = time.monotonic()
+        if route == "login":
+            if body.get("password") != self.password:
+                return 403, {"error": "bad password"}
+            token = secrets.token_hex(8)
+            with self._lock:
+                self._tokens[token] = now + self.session_ttl
+            return 200, {"token": token}
+
+        with self._lock:
+            expires = self._tokens.get(token)
+            if expires is None or expires < now:
+                self._tokens.pop(token, None)
+                return 401, {"error": "session expired"}
+
+            if route == "logout":
+                del self._tokens[token]
+                return 200, {}
+            if route == "wifi":
+                self._bands[body["band"]] = (bool(body["enable"]), now + self.apply_delay)
+                return 200, {}
+            if route == "status":
+                return 200, {
+                    band: state for band, (state, applied_at) in self._bands.items() if applied_at <= now
+                }
+        return 404, {"error": "unknown route"}
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                route = self.path.strip("/")
+                code, payload = server._handle(route, self.headers.get("Authorization"), body)
+
+                data = json.dumps(payload).encode()
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+class FakeRouterClient:
+    """tplinkrouterc6u-style client for FakeRouterServer."""
+
+    def __init__(self, host, password, timeout=10):
+        self.host = host
+        self.password = password
+        self.timeout = timeout
+        self._token = None
+
+    def authorize(self):
+        self._token = self._post("login", {"password": self.password})["token"]
+
+    def set_wifi(self, band, enable):
+        self._post("wifi", {"band": band.value, "enable": enable})
+
+    def get_status(self):
+        status = Status()
+        for band, state in self._post("status", {}).items():
+            setattr(status, status_field(Connection(band)), state)
+        return status
+
+    def logout(self):
+        self._post("logout", {})
+        self._token = None
+
+    def _post(self, route, body):
+        request = urllib.request.Request(
+            f"http://{self.host}/{route}",
+            data=json.dumps(body).encode(),
+            headers={"Content-Type": "application/json", "Authorization": self._token or ""},
+            method="POST",
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.load(response)
+        except urllib.error.HTTPError as e:
+            raise ConnectionError(f"{route} failed with HTTP {e.code}") from None
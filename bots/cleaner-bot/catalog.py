@@ -0,0 +1,123 @@
+import logging
+from bisect import bisect_left
+from collections import namedtuple
+
+from config_store import ConfigStore
+
+
+logger = logging.getLogger(__name__)
+
+CatalogEntry = namedtuple("CatalogEntry", "name points owner category")
+
+
+class TaskCatalog:
+    """Tasks and rewards loaded from a JSON file, indexed for fast lookup.
+
+    The file maps an owner ("household", "leon", ...) to its ``tasks``,
+    optional ``rewards`` and optional ``aliases``. Everything is folded into
+    one ``(owner, name) -> CatalogEntry`` map plus a sorted name list per
+    owner for prefix lookups. The file is hot-reloaded when its mtime
+    changes, and rendered listings are cached per catalog version.
+    """
+
+    def __init__(self, path, check_interval=5.0):
+        self._store = ConfigStore(path, {}, check_interval)
+        self._version = None
+
+        self.entries = {}
+        self._ordered = {}
+        self._sorted_names = {}
+        self._aliases = {}
+        self._rendered = {}
+
+    @property
+    def version(self):
+        self._refresh()
+        return self._version
+
+    def reload(self):
+        """Re-read the catalog file now instead of waiting for the mtime check."""
+        self._store.reload()
+        self._refresh(strict=True)
+
+    def lookup(self, owner, text):
+        """Resolve a task name, alias or unambiguous prefix to a task entry."""
+        self._refresh()
+        text = text.lower()
+
+        text = self._aliases.get(owner, {}).get(text, text)
+        entry = self.entries.get((owner, text))
+        if entry is not None and entry.category == "task":
+            return entry
+
+        names = self._sorted_names.get(owner, [])
+        start = bisect_left(names, text)
+        matches = []
+        for name in names[start:]:
+            if not name.startswith(text):
+                break
+            matches.append(name)
+
+        # "swe" matches sweep and sweepbath; sweep wins because it is a
+        # prefix of every other match
+        if matches and all(name.startswith(matches[0]) for name in matches):
+            return self.entries[(owner, matches[0])]
+        return None
+
+    def tasks(self, owner, category="task"):
+        self._refresh()
+        return [entry for entry in self._ordered.get(owner, []) if entry.category == category]
+
+    def render_tasks(self, owner):
+        """The !list style message for an owner's tasks, built once per version."""
+        self._refresh()
+        key = ("tasks", owner)
+        if key not in self._rendered:
+            lines = ["**🧹 Available Tasks & Points:**\n"]
+            lines += [f"• **{entry.name}** — {entry.points} points" for entry in self.tasks(owner)]
+            self._rendered[key] = "\n".join(lines) + "\n"
+        return self._rendered[key]
+
+    def _refresh(self, strict=False):
+        try:
+            data = self._store.get()
+        except ValueError as e:
+            # Keep serving the last good catalog while the file is mid-edit
+            if strict or self._version is None:
+                raise
+            logger.warning(f"catalog reload failed, keeping version {self._version}: {e}")
+            return
+        if self._store.version != self._version:
+            self._build(data)
+            self._version = self._store.version
+
+    def _build(self, data):
+        entries = {}
+        ordered = {}
+        aliases = {}
+
+        for owner, section in data.items():
+            owner_entries = []
+            for name, pts in section.get("tasks", {}).items():
+                owner_entries.append(CatalogEntry(name.lower(), pts, owner, "task"))
+
+            rewards = section.get("rewards", {})
+            if not isinstance(rewards, dict):
+                # Free-form reward descriptions with no fixed point cost
+                rewards = dict.fromkeys(rewards)
+            for name, pts in rewards.items():
+                owner_entries.append(CatalogEntry(name, pts, owner, "reward"))
+
+            for entry in owner_entries:
+                entries[(owner, entry.name)] = entry
+            ordered[owner] = owner_entries
+            aliases[owner] = {k.lower(): v.lower() for k, v in section.get("aliases", {}).items()}
+
+        self.entries = entries
+        self._ordered = ordered
+        self._aliases = aliases
+        self._sorted_names = {
+            owner: sorted(entry.name for entry in owner_entries if entry.category == "task")
+            for owner, owner_entries in ordered.items()
+        }
+        self._rendered = {}
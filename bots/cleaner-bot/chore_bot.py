@@ -4,64 +4,63 @@ import json
 import os
 from dotenv import load_dotenv
 from datetime import datetime, timedelta, time
+from functools import cached_property
 import logging
-import pytz
-from tplinkrouterc6u import TplinkRouterProvider, Connection, TplinkRouter
-from tplinkrouterc6u.common.exception import ClientError
 import asyncio
+import signal
 import time as time_module
+from ledger import PointsLedger
+from sqlite_store import SqlitePointsStore
+from router import RouterGroup, RouterWorker, parse_targets
+from wifi_schedule import WifiScheduler
+from reminders import ReminderScheduler, DEFAULT_TIMEZONE
+from config_store import ConfigStore
+from catalog import TaskCatalog
+from transactions import TransactionPipeline, InsufficientPoints
+from rankings import Leaderboard, PeriodStats, PERIODS
+from metrics import metrics
+from log_setup import setup_logging
 
 
 # ===== ROUTER CONFIGURATION =====
-load_dotenv()
-ROUTER_IP = os.getenv('ROUTER_IP', '')
-ROUTER_PASSWORD = os.getenv('ROUTER_PASSWORD','')
-TARGET_MAC = os.getenv('TARGET_MAC','')
-GUEST_BAND= Connection.GUEST_5G
-
-# Get the client class once
-RouterClient = TplinkRouterProvider.get_client(ROUTER_IP, ROUTER_PASSWORD).__class__
+# Read from the environment (or .env) the first time a router is needed:
+#   ROUTER_IP, ROUTER_PASSWORD, TARGET_MAC
+#   ROUTER_TARGETS: optional list of routers and bands to switch together,
+#     for example "192.168.0.1=guest_2g+guest_5g,192.168.0.2=guest_5g".
+#     Defaults to GUEST_BAND on ROUTER_IP.
+#   ROUTER_VERIFY_TIMEOUT: how long to wait for the router to confirm a
+#     toggle; unset uses the band default
+GUEST_BAND = "guest_5g"
+
+def build_routers():
+    """One authorized session per router, reused across toggles and logged
+    out on shutdown. Nothing connects until the first toggle."""
+    password = os.getenv('ROUTER_PASSWORD', '')
+    spec = os.getenv('ROUTER_TARGETS') or f"{os.getenv('ROUTER_IP', '')}={GUEST_BAND}"
+    router_targets = parse_targets(spec, password)
+
+    verify_timeout = os.getenv('ROUTER_VERIFY_TIMEOUT')
+    if verify_timeout:
+        for session in router_targets:
+            session.verify_timeout = float(verify_timeout)
+    return RouterGroup(router_targets)
 
 def block_wifi_indefinite(state=False):
-    try:
-        if not state:
-            print("Blocking wifi.")
-        else: 
-            print("Unblocking wifi.")
-
-        client = RouterClient(ROUTER_IP, ROUTER_PASSWORD)
-        client.authorize()
-        client.set_wifi(GUEST_BAND, state)
-        time_module.sleep(2)
-        status = client.get_status()
-        current_state = status.guest_5g_enable
-        
-        if state == False:
-            if current_state == False:
-                print("The wifi is off.")
-                return True
-            else: 
-                print("Wifi failed to turn off.")
-                return False
-        
-        if state == True:
-            if current_state == True:
-                print("Wifi is turned on.")
-                return True
-            else:
-                print("Wifi failed to turn on.")
-                return False
-
-        client.logout()
-
-    except Exception as e:
-        print(f"❌ Error in wifi turning off: {e}")
-        return False
+    """Switch every configured band and wait until each reports the new state."""
+    results = app.routers.toggle(state)
+    ok = all(result == "ok" for result in results.values())
+
+    summary = ", ".join(f"{target}={result}" for target, result in results.items())
+    logger.log(
+        logging.INFO if ok else logging.WARNING,
+        f"wifi {'on' if state else 'off'}: {summary}",
+        extra={"router_result": results},
+    )
+    return ok
 
 async def async_wifi_control(state: bool) -> bool:
-    """Helper to run WiFi control in thread pool"""
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(None, block_wifi_indefinite, state)
+    """Queue a WiFi toggle on the router worker and wait for the result"""
+    return await app.router_worker.set_wifi(state)
 
 
 
@@ -69,53 +68,8 @@ async def async_wifi_control(state: bool) -> bool:
 # Predefined Chores & Points
 # ---------------------------
 
-CHORE_POINTS = {
-    "scoop": 5,
-    "sweepbath": 15, 
-    "sweep": 10, 
-    "laundry": 5, 
-    "fold": 30,
-    "hang": 10,
-    "workout": 30,
-    "vaclive": 15, 
-    "vacoffice": 10,
-    "vacbed": 10,
-    "dust": 2,
-    "mirror": 3,
-    "mopbath": 15,
-    "mop": 12,
-    "dusteverything": 5,
-    "declutter": 7,
-    "fridge": 5,
-    "random": 10,
-    "work": 3, 
-    "foodprep": 8,
-    "souschef": 25,
-    "gradschool": 10,
-    "workout": 40,
-    "study": 10,
-}
-
-LEON_TASKS = {
-    "code": 5, 
-    "work": 15,
-    "network": 5,
-    "workout": 10,
-    "leetcode": 20,
-    "keyboard": 5,
-    "cardio": 10,
-}
-
-LEON_REWARDS = {
-    "game": 30,
-    "takeout": 100,
-    "videos": 30,
-}
-
-REWARDS = {
-    "TV: 1 point = 1 minute",
-    "Leon reading comic: 1 point = 1 minute",
-}
+# Tasks and rewards live in catalog.json and are hot-reloaded on change
+CATALOG_FILE = "catalog.json"
 
 # -------------------------------
 # Predefined time reset config
@@ -130,72 +84,243 @@ DEFAULT_CONFIG = {
 # -------------------------------
 # Setting up logging for the bot
 # -------------------------------
+# main() sends records through a queue to a rotating JSON log, so handlers
+# never wait on disk. Importing this module configures nothing.
 logger = logging.getLogger(__name__)
-logging.basicConfig(filename="bot.log", encoding="utf-8", level=logging.INFO)
-logging.getLogger('discord').setLevel(logging.WARNING)
 
 
 # ---------------------------
 # Bot Setup
 # ---------------------------
 
-intents = discord.Intents.default()
-intents.message_content = True
+class App:
+    """The bot's services, each created the first time it is used.
 
-bot = commands.Bot(command_prefix="!", intents=intents)
+    Importing chore_bot opens no files, reads no environment and talks to
+    no router; the points store is loaded when the bot starts (or when a
+    benchmark first touches it) and the router client when the WiFi is
+    first toggled.
+    """
+
+    def __init__(self):
+        self.bot = None
+        self.log_listener = None
+
+    def created(self, name):
+        return name in self.__dict__
+
+    @cached_property
+    def store(self):
+        # "ledger" (default) keeps points in points.json + points.log,
+        # "sqlite" keeps every transaction in points.db
+        if os.getenv('POINTS_BACKEND', 'ledger').lower() == "sqlite":
+            store = SqlitePointsStore(POINTS_DB)
+            store.load()
+            # Switching backends shouldn't reset everyone: a new database
+            # starts from whatever the ledger files hold
+            if not store.balances and (os.path.exists(POINTS_FILE) or os.path.exists(POINTS_LOG)):
+                ledger = PointsLedger(POINTS_FILE, POINTS_LOG)
+                try:
+                    store.import_balances(ledger.load())
+                finally:
+                    ledger.close()
+        else:
+            store = PointsLedger(POINTS_FILE, POINTS_LOG)
+            store.load()
+        return store
+
+    @cached_property
+    def pipeline(self):
+        # Every earn/spend goes through here; a background thread batches the writes
+        pipeline = TransactionPipeline(self.store)
+        pipeline.on_flushed.append(lambda batch, seconds: metrics.observe("points.flush", seconds))
+        # Keep the leaderboard and period totals current as each change lands
+        pipeline.on_applied.append(self.leaderboard.apply)
+        pipeline.on_applied.append(self.period_stats.apply)
+        return pipeline
+
+    @cached_property
+    def leaderboard(self):
+        return Leaderboard(self.store.balances)
+
+    @cached_property
+    def period_stats(self):
+        period_stats = PeriodStats(PERIOD_STATS_FILE)
+        period_stats.load()
+        return period_stats
+
+    @cached_property
+    def routers(self):
+        return build_routers()
+
+    @cached_property
+    def router_worker(self):
+        # Every toggle goes through one queue and one thread, so they never race
+        return RouterWorker(block_wifi_indefinite)
+
+    @cached_property
+    def wifi_schedule(self):
+        return WifiScheduler(WIFI_SESSIONS_FILE, async_wifi_control, notify_channel)
+
+    @cached_property
+    def reminders(self):
+        return ReminderScheduler(REMINDERS_FILE, notify_channel, DEFAULT_REMINDERS)
+
+    @cached_property
+    def config_store(self):
+        return ConfigStore(CONFIG_FILE, DEFAULT_CONFIG)
+
+    @cached_property
+    def catalog(self):
+        return TaskCatalog(CATALOG_FILE)
+
+    async def close(self):
+        """Stop whatever was started, flushing points and logging out of the routers."""
+        loop = asyncio.get_running_loop()
+        if self.created("wifi_schedule"):
+            await self.wifi_schedule.stop()
+        if self.created("reminders"):
+            await self.reminders.stop()
+        if self.created("router_worker"):
+            if self.created("routers"):
+                await self.router_worker.run(self.routers.close)
+            await self.router_worker.stop()
+        elif self.created("routers"):
+            await loop.run_in_executor(None, self.routers.close)
+        if self.created("pipeline"):
+            # Stop the writer thread after it flushes whatever is still buffered
+            await loop.run_in_executor(None, self.pipeline.close)
+        if self.created("store"):
+            self.store.close()
+        if self.created("period_stats"):
+            self.period_stats.save()
+        if self.log_listener is not None:
+            self.log_listener.stop()
+            self.log_listener = None
+
+app = App()
+
+class ChoreBot(commands.Bot):
+    _cleaned_up = False
+    # Bumped on every registry change so cached help pages know to rebuild
+    commands_version = 0
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._help_cache = {"version": None, "embeds": []}
+
+    def add_command(self, command):
+        super().add_command(command)
+        self.commands_version += 1
+
+    def remove_command(self, name):
+        command = super().remove_command(name)
+        self.commands_version += 1
+        return command
+
+    async def setup_hook(self):
+        # Load the points off the event loop before the first command arrives
+        await asyncio.get_running_loop().run_in_executor(None, lambda: app.store)
+
+        # Pick up WiFi sessions that were still running before a restart
+        app.wifi_schedule.load()
+        app.wifi_schedule.start()
+        app.reminders.load()
+        app.reminders.start()
+        reset_loop.start()
+        dump_metrics.start()
+        save_period_stats.start()
+
+        # Docker stops the container with SIGTERM (we run as PID 1); close
+        # cleanly so buffered points are flushed and the router logs out
+        try:
+            asyncio.get_running_loop().add_signal_handler(
+                signal.SIGTERM, lambda: asyncio.create_task(self.close())
+            )
+        except NotImplementedError:
+            pass  # Windows event loops have no signal handlers
+
+    async def close(self):
+        # SIGTERM and bot.run() can both close us; only clean up once
+        if not self._cleaned_up:
+            self._cleaned_up = True
+            reset_loop.cancel()
+            dump_metrics.cancel()
+            save_period_stats.cancel()
+            await app.close()
+        await super().close()
+
+    async def on_message(self, message):
+        # Most messages are ordinary chat; skip command parsing for them
+        if not message.content.startswith(self.command_prefix):
+            return
+
+        if message.content.strip() == "!":
+            for embed in help_embeds(self):
+                await message.channel.send(embed=embed)
+            return
+
+        await self.process_commands(message)
+
+    async def on_command_error(self, ctx, error):
+        if isinstance(error, commands.CommandOnCooldown):
+            retry = round(error.retry_after / 3600, 1)
+            if ctx.command.name == "breakfast":
+                await ctx.send(f"Breakfast was used too recently. Try again in {retry} hours.")
+            elif ctx.command.name == "lunch":
+                await ctx.send(f"Lunch was used too recently. Try again in {retry} hours.")
+            elif ctx.command.name == "dinner":
+                await ctx.send(f"Dinner was used too recently. Try again in {retry} hours.")
+
+
+async def notify_channel(channel_id, message):
+    channel = app.bot.get_channel(channel_id)
+    if channel is not None:
+        await channel.send(message)
+
+WIFI_SESSIONS_FILE = "wifi_sessions.json"
 
 
 # ------------------------------
 # Bot commands for wifi control
 # ------------------------------
 
-@bot.command()
+@commands.command()
 @commands.has_permissions(administrator=True)
 async def wifi(ctx, status:str):
     status = status.lower()
     if status == 'on':
-        success = await asyncio.get_event_loop().run_in_executor(None, block_wifi_indefinite, True)
+        success = await async_wifi_control(True)
         if success:
             await ctx.send(f"Wifi turned on!")
         else:
             await ctx.send("Wif was not turned on!")
-    if status == 'off':
-        success = await asyncio.get_event_loop().run_in_executor(None, block_wifi_indefinite, False)
+    elif status == 'off':
+        success = await async_wifi_control(False)
         if success:
             await ctx.send(f"Wifi turned off!")
         else:
             await ctx.send("Wif was not turned off!")
     else:
-        ctx.send("Wifi was unable to change to on/off.")
+        await ctx.send("Wifi was unable to change to on/off.")
 
 async def timed_wifi(ctx, duration_minutes: int, label: str = "session"):
-    """Turn WiFi on for a duration, then off"""
-    # Turn ON
-    duration_minutes = duration_minutes - 1
+    """Turn WiFi on now and schedule it off after duration_minutes"""
+    deadline = time_module.time() + duration_minutes * 60
 
+    # Register the session before toggling, so a session that expires
+    # while the router is busy sees this one and leaves the WiFi on
+    session = app.wifi_schedule.add(deadline, label, ctx.channel.id)
     if not await async_wifi_control(True):
+        app.wifi_schedule.remove(session)
         await ctx.send("❌ Failed to turn on WiFi")
         return False
-    
-    await asyncio.sleep(60)
+
     await ctx.send(f"✅ WiFi enabled!")
-    
-    # Wait
-    duration_minutes = duration_minutes + 1
-    await asyncio.sleep(duration_minutes * 60)
-    
-    # Turn OFF
-    await ctx.send(f"⏰ {label.capitalize()} time over! Turning WiFi OFF...")
-    
-    if await async_wifi_control(False):
-        await ctx.send("🚫 WiFi is now OFF")
-        return True
-    else:
-        await ctx.send("❌ Failed to turn off WiFi")
-        return False
+    return True
 
 
-@bot.command(help="Turn on Wifi for 45 minutes for breakfast")
+@commands.command(help="Turn on Wifi for 45 minutes for breakfast")
 @commands.cooldown(1, 28800, commands.BucketType.guild)  # 1 use per 8 hours
 async def breakfast(ctx):
     epoch = int((datetime.now() + timedelta(minutes=46)).timestamp())
@@ -203,7 +328,7 @@ async def breakfast(ctx):
     await ctx.send(f"Breakfast will end in: <t:{epoch}:R>.")
     await timed_wifi(ctx, 46, "breakfast")
 
-@bot.command(help="Turn on Wifi for 60 minutes for lunch")
+@commands.command(help="Turn on Wifi for 60 minutes for lunch")
 @commands.cooldown(1, 28800, commands.BucketType.guild)  # 1 use per 8 hours
 async def lunch(ctx):
     epoch = int((datetime.now() + timedelta(minutes=61)).timestamp())
@@ -212,7 +337,7 @@ async def lunch(ctx):
     await timed_wifi(ctx, 61, "lunch")
 
 
-@bot.command(help="Turn on Wifi for 60 minutes for dinner")
+@commands.command(help="Turn on Wifi for 60 minutes for dinner")
 @commands.cooldown(1, 28800, commands.BucketType.guild)  # 1 use per 8 hours
 async def dinner(ctx):
     epoch = int((datetime.now() + timedelta(minutes=61)).timestamp())
@@ -220,57 +345,93 @@ async def dinner(ctx):
     await ctx.send(f"Dinner will end in: <t:{epoch}:R>.")
     await timed_wifi(ctx, 61, "dinner")
 
-@bot.event
-async def on_command_error(ctx, error):
-    if isinstance(error, commands.CommandOnCooldown):
-        retry = round(error.retry_after / 3600, 1)
-        if ctx.command.name == "breakfast":
-            await ctx.send(f"Breakfast was used too recently. Try again in {retry} hours.")
-        elif ctx.command.name == "lunch":
-            await ctx.send(f"Lunch was used too recently. Try again in {retry} hours.")
-        elif ctx.command.name == "dinner":
-            await ctx.send(f"Dinner was used too recently. Try again in {retry} hours.")
-
 # ---------------------------
 # Load & Save Point Data
 # ---------------------------
 
 POINTS_FILE = "points.json"
+POINTS_LOG = "points.log"
+POINTS_DB = "points.db"
 
 def load_points():
-    if not os.path.exists(POINTS_FILE):
-        return {}
-    with open(POINTS_FILE, "r") as f:
-        return json.load(f)
+    return app.store.balances
+
+@metrics.timed("points.replace")
+async def save_points(data, before=None):
+    """Replace every balance at once. Single changes go through the pipeline."""
+    await app.pipeline.replace(data, before)
+    app.leaderboard.rebuild(app.store.balances)
+
+def get_points(user_id):
+    return app.pipeline.balance(user_id)
+
+# Per-chore totals for !stats, updated on every transaction
+PERIOD_STATS_FILE = "period_stats.json"
+
+@tasks.loop(minutes=1)
+async def save_period_stats():
+    app.period_stats.save()
+
+# ------------------------------
+# Instrumentation
+# ------------------------------
+
+METRICS_FILE = "metrics.json"
 
-def save_points(data):
-    with open(POINTS_FILE, "w") as f:
-        json.dump(data, f, indent=4)
+async def start_command_timer(ctx):
+    ctx.started_at = time_module.perf_counter()
+
+async def record_command_latency(ctx):
+    started = getattr(ctx, "started_at", None)
+    if started is None:
+        return
+    elapsed = time_module.perf_counter() - started
+    metrics.observe(f"command.{ctx.command.qualified_name}", elapsed, error=ctx.command_failed)
+    logger.info(
+        f"command {ctx.command.qualified_name} {'failed' if ctx.command_failed else 'done'}",
+        extra={
+            "user": ctx.author.name,
+            "command": ctx.command.qualified_name,
+            "latency_ms": round(elapsed * 1000, 2),
+        },
+    )
 
-points = load_points()
+@tasks.loop(minutes=1)
+async def dump_metrics():
+    await asyncio.get_running_loop().run_in_executor(None, metrics.dump, METRICS_FILE)
 
 # ------------------------------
 # Custom point reset functions
 # ------------------------------
 
+CONFIG_FILE = "reset_config.json"
+
 def load_config():
-    try:
-        with open('reset_config.json', 'r') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return DEFAULT_CONFIG.copy()
+    return app.config_store.get()
 
 def save_config(config):
-    with open('reset_config.json', 'w') as f:
-        json.dump(config, f, indent=2)
-
-def clear_all_points():
-    data = load_points()
-    for points in data:
-        data[points] = 0
-    save_points(data)
+    app.config_store.save(config)
+
+RESET_ARCHIVE_FILE = "reset_archive.jsonl"
+
+def archive_points(config):
+    """Append the closing period's totals to the reset archive."""
+    entry = {
+        "period_start": config.get("last_reset"),
+        "period_end": str(datetime.now().date()),
+        "points": {user_id: pts for user_id, pts in load_points().items() if pts},
+    }
+    with open(RESET_ARCHIVE_FILE, "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+async def clear_all_points():
+    """Archive the current totals, then zero every balance in memory and on disk."""
+    config = load_config()
+    await save_points({user_id: 0 for user_id in load_points()}, lambda: archive_points(config))
 
-def calculate_next_reset(interval, reset_day=None, custom_date=None):
+def calculate_next_reset(interval, reset_day=None, custom_date=None, last_reset=None):
     now = datetime.now()
     
     if interval == "daily":
@@ -288,68 +449,141 @@ def calculate_next_reset(interval, reset_day=None, custom_date=None):
     
     elif interval == "biweekly":
         # Calculate 2 weeks from last reset
-        config = load_config()
-        last_reset = datetime.fromisoformat(config.get("last_reset", str(now.date())))
+        last_reset = datetime.fromisoformat(last_reset or str(now.date()))
         return last_reset + timedelta(weeks=2)
     
     elif interval == "custom":
         return datetime.fromisoformat(custom_date)
 
+# Longest a scheduled reset may be overdue and still run
+RESET_GRACE = {"daily": timedelta(days=1), "weekly": timedelta(weeks=1), "biweekly": timedelta(weeks=2)}
+
 # Check if reset needed
-def check_and_reset_points():
+async def check_and_reset_points():
     config = load_config()
     now = datetime.now()
+    if not config.get("next_reset_date"):
+        return False
     next_reset = datetime.fromisoformat(config["next_reset_date"])
-    
-    if now >= next_reset:
-        # DO THE RESET
-        clear_all_points()
-        
-        # Calculate next reset
-        config["last_reset"] = str(now.date())
+
+    grace = RESET_GRACE.get(config["reset_interval"])
+    if grace is not None and now - next_reset > grace:
+        # Missed by more than a whole interval (the bot was down, or the
+        # config is stale): nobody expects a wipe now, so start the
+        # schedule over from today instead
         config["next_reset_date"] = str(calculate_next_reset(
-            config["reset_interval"], 
-            config.get("reset_day")
+            config["reset_interval"],
+            config.get("reset_day"),
+            config.get("custom_date"),
+            str(now.date())
         ).date())
-        
         save_config(config)
+        logger.warning(
+            f"points reset due {next_reset.date()} was missed; "
+            f"balances kept, next reset {config['next_reset_date']}"
+        )
+        return False
+
+    if now >= next_reset:
+        # DO THE RESET
+        await clear_all_points()
+        mark_reset(config, now)
         return True
     return False
 
-cst = pytz.timezone('America/Chicago')
+def mark_reset(config, now):
+    """Record a reset done at ``now`` and schedule the next one."""
+    config["last_reset"] = str(now.date())
+    upcoming = calculate_next_reset(
+        config["reset_interval"],
+        config.get("reset_day"),
+        config.get("custom_date"),
+        config["last_reset"]
+    )
+    # A custom date only fires once; wait for a new !set_reset after it
+    config["next_reset_date"] = str(upcoming.date()) if upcoming > now else None
+    save_config(config)
 
-#@tasks.loop(time=time(minute=1))
+@tasks.loop()
+async def reset_loop():
+    """Sleep until the next reset date, then reset. Restarted on schedule changes."""
+    next_reset_date = load_config().get("next_reset_date")
+    if not next_reset_date:
+        reset_loop.stop()
+        return
 
-#time loops for scooping reminder
-@tasks.loop(time=time(hour=16, minute=0, tzinfo=cst))  # 4 PM
-async def afternoon_reminder():
-    now = datetime.now()
-    day = now.weekday()  # 0=Monday, 6=Sunday
-    channel = bot.get_channel(1450629690497962075)
-    
-    # Monday, Wednesday, Friday
-    if day in [0, 2, 4]:
-        await channel.send("🐱 Sophia scoop check-in time!")
+    delay = (datetime.fromisoformat(next_reset_date) - datetime.now()).total_seconds()
+    if delay > 0:
+        await asyncio.sleep(delay)
 
-#time loops for scooping reminder
-@tasks.loop(time=time(hour=19, minute=0, tzinfo=cst))  # 7 PM
-async def evening_reminder():
-    now = datetime.now()
-    day = now.weekday()  # 0=Monday, 6=Sunday
-    
-    channel = bot.get_channel(1450629690497962075)
-    
-    # Monday, Wednesday, Friday
-    if day in [0, 2, 4]:
-        await channel.send("🐱 Sophia scoop check-in time!")
+    if await check_and_reset_points():
+        logger.info(f"points reset, next reset {load_config().get('next_reset_date')}")
+
+def reschedule_reset():
+    """Make reset_loop pick up a changed next_reset_date."""
+    if reset_loop.is_running():
+        reset_loop.restart()
+    else:
+        reset_loop.start()
 
-@bot.event
-async def on_ready():
-    afternoon_reminder.start()
-    evening_reminder.start()
+# ------------------------------
+# Channel reminders
+# ------------------------------
+
+# Cron-style reminders, all run by one scheduler task. Used until the
+# first !remind_add / !remind_remove writes reminders.json.
+REMINDERS_FILE = "reminders.json"
+
+DEFAULT_REMINDERS = [
+    {"id": 1, "schedule": "0 16 * * 1,3,5", "channel_id": 1450629690497962075,
+     "message": "🐱 Sophia scoop check-in time!", "timezone": "America/Chicago"},
+    {"id": 2, "schedule": "0 19 * * 1,3,5", "channel_id": 1450629690497962075,
+     "message": "🐱 Sophia scoop check-in time!", "timezone": "America/Chicago"},
+]
+
+@commands.command(help="List the scheduled channel reminders.")
+async def reminders(ctx):
+    scheduler = app.reminders
+    if not scheduler.reminders:
+        await ctx.send("No reminders set.")
+        return
+
+    lines = ["**⏰ Reminders**\n"]
+    for reminder_id, entry in sorted(scheduler.reminders.items()):
+        next_run = scheduler.next_run(reminder_id)
+        lines.append(
+            f"`#{reminder_id}` `{entry['schedule']}` ({entry['timezone']}) in <#{entry['channel_id']}>"
+            f"{f' next <t:{int(next_run)}:R>' if next_run else ''}: {entry['message']}"
+        )
+    await ctx.send("\n".join(lines)[:2000])
+
+@commands.command()
+@commands.has_permissions(administrator=True)
+async def remind_add(ctx, schedule: str, channel: discord.TextChannel, *, message: str):
+    """
+    Usage (cron: minute hour day month weekday, 0 = Sunday):
+    !remind_add "0 16 * * 1,3,5" #chores 🐱 Scoop check-in time!
+    !remind_add "CRON_TZ=Europe/London 30 8 * * *" #general Morning!
+    """
+    try:
+        entry = app.reminders.add(schedule, channel.id, message, DEFAULT_TIMEZONE)
+    except ValueError as e:
+        await ctx.send(f"❌ {e}")
+        return
+    next_run = app.reminders.next_run(entry["id"])
+    await ctx.send(f"✅ Reminder #{entry['id']} added, first one <t:{int(next_run)}:f>.")
+
+@commands.command()
+@commands.has_permissions(administrator=True)
+async def remind_remove(ctx, reminder_id: int):
+    """Delete a reminder by the number !reminders shows."""
+    if app.reminders.remove(reminder_id):
+        await ctx.send(f"🗑️ Reminder #{reminder_id} removed.")
+    else:
+        await ctx.send(f"❌ No reminder #{reminder_id}.")
 
 # Discord commands
-@bot.command()
+@commands.command()
 @commands.has_permissions(administrator=True)
 async def set_reset(ctx, interval: str, *, details: str = "monday"):
     """
@@ -371,10 +605,12 @@ async def set_reset(ctx, interval: str, *, details: str = "monday"):
     config["next_reset_date"] = str(calculate_next_reset(
         config["reset_interval"],
         config.get("reset_day"),
-        config.get("custom_date")
+        config.get("custom_date"),
+        config.get("last_reset")
     ).date())
     
     save_config(config)
+    reschedule_reset()
     
     await ctx.send(
         f"✅ Reset schedule updated!\n"
@@ -382,22 +618,17 @@ async def set_reset(ctx, interval: str, *, details: str = "monday"):
         f"Next reset: **{config['next_reset_date']}**"
     )
 
-@bot.command()
+@commands.command()
 @commands.has_permissions(administrator=True)
 async def force_reset(ctx):
     """Immediately clear all points"""
-    clear_all_points()
-    config = load_config()
-    config["last_reset"] = str(datetime.now().date())
-    config["next_reset_date"] = str(calculate_next_reset(
-        config["reset_interval"],
-        config.get("reset_day")
-    ).date())
-    save_config(config)
+    await clear_all_points()
+    mark_reset(load_config(), datetime.now())
+    reschedule_reset()
     
     await ctx.send("💥 All points have been reset!")
 
-@bot.command()
+@commands.command()
 async def next_reset(ctx):
     """Check when points reset"""
     config = load_config()
@@ -406,162 +637,136 @@ async def next_reset(ctx):
         f"Reset interval: **{config['reset_interval']}**"
     )
 
+@commands.command()
+@commands.has_permissions(administrator=True)
+async def perf(ctx):
+    """Show command and router latency percentiles."""
+    snapshot = metrics.snapshot()
+    lines = [f"{'name':<24}{'count':>7}{'err':>5}{'p50':>9}{'p95':>9}{'p99':>9}"]
+    for name, row in snapshot["latency"].items():
+        lines.append(
+            f"{name[:23]:<24}{row['count']:>7}{row['errors']:>5}"
+            f"{row['p50_ms']:>9}{row['p95_ms']:>9}{row['p99_ms']:>9}"
+        )
+    gauges = ", ".join(f"{name}={value}" for name, value in snapshot["gauges"].items())
+
+    await ctx.send(
+        f"📊 Uptime {snapshot['uptime_s'] // 60} min (latencies in ms)\n"
+        f"```\n" + "\n".join(lines)[:1800] + "\n```\n"
+        f"{gauges}"
+    )
+
 # ---------------------------
 # Help menu
 # ---------------------------
 
-@bot.event
-async def on_message(message):
-    if message.content.strip() == "!":
+# Discord caps an embed at 25 fields and a field value at 1024 characters
+HELP_FIELDS_PER_PAGE = 25
+HELP_VALUE_LIMIT = 1024
+
+def help_embeds(bot):
+    """The help pages, rebuilt only when a command is added or removed."""
+    cache = bot._help_cache
+    if cache["version"] == bot.commands_version:
+        return cache["embeds"]
+
+    cmds = sorted(bot.commands, key=lambda cmd: cmd.name)
+    pages = [cmds[i:i + HELP_FIELDS_PER_PAGE] for i in range(0, len(cmds), HELP_FIELDS_PER_PAGE)]
+
+    embeds = []
+    for number, page in enumerate(pages, start=1):
+        title = "Bank bot commands"
+        if len(pages) > 1:
+            title += f" ({number}/{len(pages)})"
         embed = discord.Embed(
-            title="Bank bot commands",
+            title=title,
             description="Here are the commands you can use:",
             color=0x00ff00
         )
-        for cmd in bot.commands:
+        for cmd in page:
             embed.add_field(
                 name=f"!{cmd.name}",
-                value=cmd.help or "No description provided",
+                value=(cmd.help or "No description provided")[:HELP_VALUE_LIMIT],
                 inline=False
             )
-        await message.channel.send(embed=embed)
+        embeds.append(embed)
 
-    await bot.process_commands(message)
+    cache["version"] = bot.commands_version
+    cache["embeds"] = embeds
+    return embeds
 
 # ---------------------------
 # Commands
 # ---------------------------
 
-@bot.command(help="Adds points to your account based on what chore completed.")
-async def finish(ctx, chore_name: str, amount: int=0):
-    """Completes a chore and adds the appropriate points."""
+async def complete_task(ctx, owner, chore_name, amount, example):
+    """Shared body of !finish and !lf: work out the points and earn them."""
     chore_name = chore_name.lower()
     user_id = str(ctx.author.id)
-    
+
     if not chore_name:  # Catches None and empty string
-        await ctx.send("❌ Please specify a task! Example: `!finish sweep`")
+        await ctx.send(f"❌ Please specify a task! Example: `{example}`")
         return
 
     if chore_name == 'study' and amount != 0:
-        amount = amount // 2
-        points[user_id] += amount
-        save_points(points)
-        
-        logging.info(f"user {ctx.author.name} completed {chore_name}")
-        await ctx.send(
-            f"✅ {ctx.author.mention} completed **{chore_name}** "
-            f"and earned **{amount} points!**\n"
-            f"💰 New total: **{points[user_id]} points**"
-        )
-        return
-
+        # Study time is logged in minutes and earns half a point per minute
+        earned = amount // 2
+    elif amount > 0:
+        earned = amount
+    else:
+        task = app.catalog.lookup(owner, chore_name)
+        if task is None:
+            await ctx.send(
+                f"❌ Unknown chore: **{chore_name}**\n"
+                f"Use `!list` to see all available chores."
+            )
+            return
+        chore_name = task.name
+        earned = task.points
 
-    if amount > 0:
-        points[user_id] += amount
-        save_points(points)
-        
-        logging.info(f"user {ctx.author.name} completed {chore_name}")
-        await ctx.send(
-            f"✅ {ctx.author.mention} completed **{chore_name}** "
-            f"and earned **{amount} points!**\n"
-            f"💰 New total: **{points[user_id]} points**"
-        )
-        return
-     
-    if chore_name not in CHORE_POINTS:
-        await ctx.send(
-            f"❌ Unknown chore: **{chore_name}**\n"
-            f"Use `!list` to see all available chores."
-        )
+    if earned <= 0:
+        await ctx.send("❌ That is not enough to earn any points.")
         return
 
+    txn = await app.pipeline.earn(user_id, earned, chore_name, key=ctx.message.id)
+    if txn.replayed:
+        return  # Gateway replay of a message we already credited
 
-    if user_id not in points:
-        points[user_id] = 0
-
-    earned = CHORE_POINTS[chore_name]
-    points[user_id] += earned
-    save_points(points)
-    
-    logging.info(f"user {ctx.author.name} completed {chore_name}")
+    logger.info(
+        f"user {ctx.author.name} completed {chore_name}",
+        extra={"user": ctx.author.name, "command": ctx.command.name, "chore": chore_name, "points": earned},
+    )
     await ctx.send(
         f"✅ {ctx.author.mention} completed **{chore_name}** "
         f"and earned **{earned} points!**\n"
-        f"💰 New total: **{points[user_id]} points**"
+        f"💰 New total: **{txn.balance} points**"
     )
 
 
-@bot.command(help="Adds points to your account based on what task is completed.")
-async def lf(ctx, chore_name: str, amount: int=0):
-    """Completes a task and adds the appropriate points."""
-    chore_name = chore_name.lower()
-    user_id = str(ctx.author.id)
-    
-    if not chore_name:  # Catches None and empty string
-        await ctx.send("❌ Please specify a task! Example: `!lf code`")
-        return
-
-    if chore_name == 'study' and amount != 0:
-        amount = amount // 2
-        points[user_id] += amount
-        save_points(points)
-        
-        logging.info(f"user {ctx.author.name} completed {chore_name}")
-        await ctx.send(
-            f"✅ {ctx.author.mention} completed **{chore_name}** "
-            f"and earned **{amount} points!**\n"
-            f"💰 New total: **{points[user_id]} points**"
-        )
-        return
-
-
-    if amount > 0:
-        points[user_id] += amount
-        save_points(points)
-        
-        logging.info(f"user {ctx.author.name} completed {chore_name}")
-        await ctx.send(
-            f"✅ {ctx.author.mention} completed **{chore_name}** "
-            f"and earned **{amount} points!**\n"
-            f"💰 New total: **{points[user_id]} points**"
-        )
-        return
-     
-    if chore_name not in LEON_TASKS:
-        await ctx.send(
-            f"❌ Unknown chore: **{chore_name}**\n"
-            f"Use `!list` to see all available chores."
-        )
-        return
-
+@commands.command(help="Adds points to your account based on what chore completed.")
+async def finish(ctx, chore_name: str, amount: int=0):
+    """Completes a chore and adds the appropriate points."""
+    await complete_task(ctx, "household", chore_name, amount, "!finish sweep")
 
-    if user_id not in points:
-        points[user_id] = 0
 
-    earned = LEON_TASKS[chore_name]
-    points[user_id] += earned
-    save_points(points)
-    
-    logging.info(f"user {ctx.author.name} completed {chore_name}")
-    await ctx.send(
-        f"✅ {ctx.author.mention} completed **{chore_name}** "
-        f"and earned **{earned} points!**\n"
-        f"💰 New total: **{points[user_id]} points**"
-    )
+@commands.command(help="Adds points to your account based on what task is completed.")
+async def lf(ctx, chore_name: str, amount: int=0):
+    """Completes a task and adds the appropriate points."""
+    await complete_task(ctx, "leon", chore_name, amount, "!lf code")
 
 
-@bot.command(help="Used for no bones day (will take 50 points)")
+@commands.command(help="Used for no bones day (will take 50 points)")
 async def no_bones(ctx):
     user_id = str(ctx.author.id)
-    if points[user_id] < 50:
+    try:
+        txn = await app.pipeline.spend(user_id, 50, "no_bones", key=ctx.message.id)
+    except InsufficientPoints:
         await ctx.send("Not enough points to spend on No bones day. :(")
         return
-    
-    points[user_id] -= 50
+    if txn.replayed:
+        return
     
     await ctx.send("Turning on wifi.")
-    block_wifi_indefinite(True)
-    await asyncio.sleep(5)
 
     now = datetime.now()
     # Target: 9 PM today (or tomorrow if past 9 PM)
@@ -569,85 +774,197 @@ async def no_bones(ctx):
     if now >= nine_pm:
         nine_pm += timedelta(days=1)
     
-    # Delta as total minutes (integer)
-    delta_minutes = int((nine_pm - now).total_seconds() // 60)
-    epoch = int((datetime.now() + timedelta(minutes=delta_minutes)).timestamp())
-    
-    await ctx.send(f"Wifi on, will turn off at: {epoch}")
+    epoch = int(nine_pm.timestamp())
+    # Added before the toggle for the same reason as in timed_wifi
+    session = app.wifi_schedule.add(epoch, "no bones day", ctx.channel.id)
+    if not await async_wifi_control(True):
+        app.wifi_schedule.remove(session)
+        await ctx.send("❌ Failed to turn on WiFi")
+        return
 
-    await asyncio.sleep(delta_minutes*60)
-    await ctx.send("Turning off wifi...")
-    block_wifi_indefinite()
+    await ctx.send(f"Wifi on, will turn off at: <t:{epoch}:t>")
 
-@bot.command()
+@commands.command()
 async def spend(ctx, amount: int):
     """Spend points."""
     user_id = str(ctx.author.id)
-    if user_id not in points:
-        points[user_id] = 0
 
     if amount <= 0:
         await ctx.send("❌ You cannot spend negative points\n")
         return
 
-    if points[user_id] < amount:
+    try:
+        txn = await app.pipeline.spend(user_id, amount, "spend", key=ctx.message.id)
+    except InsufficientPoints as e:
         await ctx.send(
             f"❌ Not enough points!\n"
-            f"You have: **{points[user_id]} points**"
+            f"You have: **{e.balance} points**"
         )
         return
+    if txn.replayed:
+        return
 
-    points[user_id] -= amount
-    save_points(points)
-
-    amount = amount + 1
-    epoch = int((datetime.now() + timedelta(minutes=amount)).timestamp())
+    minutes = amount + 1
+    epoch = int((datetime.now() + timedelta(minutes=minutes)).timestamp())
     await ctx.send(f"Break will end at: <t:{epoch}:t>")
     await ctx.send(f"Break will end in: <t:{epoch}:R>.")
-    await timed_wifi(ctx, amount, "Break")
-
-    amount = amount - 1
+    await timed_wifi(ctx, minutes, "Break")
 
-    logging.info(f"user {ctx.author.name} spent {amount} points.")
+    logger.info(
+        f"user {ctx.author.name} spent {amount} points.",
+        extra={"user": ctx.author.name, "command": "spend", "points": -amount},
+    )
 
     await ctx.send(
         f"💸 {ctx.author.mention} spent **{amount} points**.\n"
-        f"Remaining balance: **{points[user_id]} points**"
+        f"Remaining balance: **{txn.balance} points**"
     )
 
 
-@bot.command()
+@commands.command()
 async def total(ctx):
     """Check your point total."""
     user_id = str(ctx.author.id)
-    total = points.get(user_id, 0)
+    total = get_points(user_id)
 
     await ctx.send(
         f"💰 {ctx.author.mention}, you currently have **{total} points**!"
     )
 
 
-@bot.command()
+@commands.command(help="Show the top point balances.")
+async def leaderboard(ctx, count: int = 10):
+    """Show the highest balances and your own rank."""
+    board = app.leaderboard
+    top = board.top(max(1, min(count, 25)))
+    if not top:
+        await ctx.send("Nobody has any points yet.")
+        return
+
+    medals = {1: "🥇", 2: "🥈", 3: "🥉"}
+    lines = ["**🏆 Leaderboard**\n"]
+    for place, (user_id, pts) in enumerate(top, start=1):
+        lines.append(f"{medals.get(place, f'{place}.')} <@{user_id}> — **{pts} points**")
+
+    user_id = str(ctx.author.id)
+    place = board.rank(user_id)
+    if place is not None and place > len(top):
+        lines.append(f"\nYou are #{place} of {len(board)} with **{get_points(user_id)} points**.")
+
+    # Show names without pinging everyone on the board
+    await ctx.send("\n".join(lines), allowed_mentions=discord.AllowedMentions.none())
+
+
+@commands.command(help="Chores done and points spent this period: today, week, month or all.")
+async def stats(ctx, period: str = "week"):
+    """Per-chore totals for the current day, week, month or all time."""
+    period = period.lower()
+    if period == "day":
+        period = "today"
+    if period not in PERIODS:
+        await ctx.send(f"❌ Unknown period **{period}**. Use one of: {', '.join(PERIODS)}.")
+        return
+
+    bucket, totals = app.period_stats.totals(period)
+    if not totals:
+        await ctx.send(f"No points earned or spent yet ({bucket}).")
+        return
+
+    earned = sorted(((r, t) for r, t in totals.items() if t[1] > 0), key=lambda item: -item[1][1])
+    spent = [t for t in totals.values() if t[1] < 0]
+
+    title = "all time" if period == "all" else f"{period} ({bucket})"
+    lines = [f"**📊 Chore stats for {title}**\n"]
+    for reason, (count, pts) in earned[:20]:
+        lines.append(f"• **{reason}** — {count}× for {pts} points")
+    if len(earned) > 20:
+        lines.append(f"…and {len(earned) - 20} more")
+    lines.append(
+        f"\n💰 Earned: **{sum(t[1] for _, t in earned)} points**  "
+        f"💸 Spent: **{-sum(t[1] for t in spent)} points** ({sum(t[0] for t in spent)}×)"
+    )
+    await ctx.send("\n".join(lines))
+
+
+@commands.command(help="Show your last point changes (sqlite backend only).")
+async def history(ctx, count: int = 10):
+    """Show your most recent transactions."""
+    if not hasattr(app.store, "history"):
+        await ctx.send("❌ History needs the sqlite points backend.")
+        return
+
+    def read_history():
+        # Flush first so the newest changes are in the table
+        app.pipeline.flush()
+        return app.store.history(str(ctx.author.id), limit=max(1, min(count, 25)))
+
+    rows = await asyncio.get_running_loop().run_in_executor(None, read_history)
+    if not rows:
+        await ctx.send(f"{ctx.author.mention}, you have no transactions yet.")
+        return
+
+    lines = [f"**🧾 {ctx.author.name}'s recent points:**\n"]
+    for delta, reason, ts in rows:
+        lines.append(f"• <t:{ts}:d> **{delta:+d}** — {reason or 'manual'}")
+    await ctx.send("\n".join(lines))
+
+
+@commands.command()
 async def list(ctx):
     """List all predefined chores and point values."""
-    msg = "**🧹 Available Tasks & Points:**\n\n"
-    for chore, pts in CHORE_POINTS.items():
-        msg += f"• **{chore}** — {pts} points\n"
-
-    await ctx.send(msg)
+    await ctx.send(app.catalog.render_tasks("household"))
 
-@bot.command()
+@commands.command()
 async def leon(ctx):
     """List all predefined chores and point values."""
-    msg = "**🧹 Available Tasks & Points:**\n\n"
-    for chore, pts in LEON_TASKS.items():
-        msg += f"• **{chore}** — {pts} points\n"
+    await ctx.send(app.catalog.render_tasks("leon"))
 
-    await ctx.send(msg)
+@commands.command()
+@commands.has_permissions(administrator=True)
+async def reload_tasks(ctx):
+    """Reload catalog.json without restarting the bot."""
+    try:
+        app.catalog.reload()
+    except (OSError, ValueError) as e:
+        await ctx.send(f"❌ Could not reload the task catalog: {e}")
+        return
+    await ctx.send(f"✅ Task catalog reloaded ({len(app.catalog.entries)} entries).")
 
 
 # ---------------------------
 # Run Bot
 # ---------------------------
-load_dotenv()
-bot.run(os.getenv('DISCORD_TOKEN'))
+
+def create_bot():
+    """Build the bot with every command registered. Connects to nothing."""
+    intents = discord.Intents.default()
+    intents.message_content = True
+
+    bot = ChoreBot(command_prefix="!", intents=intents)
+    for command in [obj for obj in globals().values() if isinstance(obj, commands.Command)]:
+        bot.add_command(command)
+    bot.before_invoke(start_command_timer)
+    bot.after_invoke(record_command_latency)
+
+    # Sampled on an executor thread, so never create a service from here
+    metrics.gauge("router.queue_depth",
+                  lambda: app.router_worker.queue_depth if app.created("router_worker") else 0)
+    metrics.gauge("points.pending_writes", lambda: app.pipeline.pending if app.created("pipeline") else 0)
+    metrics.gauge("wifi.sessions",
+                  lambda: app.wifi_schedule.session_count if app.created("wifi_schedule") else 0)
+
+    app.bot = bot
+    return bot
+
+def main():
+    load_dotenv()
+    app.log_listener = setup_logging("bot.log")
+    logging.getLogger('discord').setLevel(logging.WARNING)
+
+    bot = create_bot()
+    # log_handler=None keeps discord.py from adding its own root handler
+    bot.run(os.getenv('DISCORD_TOKEN'), log_handler=None)
+
+if __name__ == "__main__":
+    main()
+
@@ -0,0 +1,62 @@
+import json
+import os
+import time
+
+from atomic_file import write_json
+
+
+class ConfigStore:
+    """JSON config file cached in memory.
+
+    The file is parsed once and re-read only when its mtime changes (checked
+    at most every ``check_interval`` seconds). Saves go through a temp file
+    and an atomic rename so a crash never leaves a half-written config.
+    """
+
+    def __init__(self, path, defaults, check_interval=5.0):
+        self.path = path
+        self.defaults = defaults
+        self.check_interval = check_interval
+
+        self._config = None
+        self._mtime = None
+        self._checked_at = 0.0
+        self.version = 0
+
+    def reload(self):
+        """Drop the cache so the next get() re-reads the file."""
+        self._mtime = None
+        self._checked_at = 0.0
+
+    def get(self):
+        """Return a copy of the current config, safe to modify and save()."""
+        now = time.monotonic()
+        if self._config is None or now - self._checked_at >= self.check_interval:
+            self._checked_at = now
+            self._reload_if_changed()
+        return dict(self._config)
+
+    def save(self, config):
+        write_json(self.path, config, indent=2)
+
+        self._config = dict(config)
+        self._mtime = os.stat(self.path).st_mtime_ns
+        self.version += 1
+        self._checked_at = time.monotonic()
+
+    def _reload_if_changed(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            if self._mtime is not None or self._config is None:
+                self._config = dict(self.defaults)
+                self._mtime = None
+                self.version += 1
+            return
+
+        if mtime == self._mtime:
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            self._config = json.load(f)
+        self._mtime = mtime
+        self.version += 1
@@ -0,0 +1,201 @@
+import json
+import os
+import threading
+import time
+
+from atomic_file import write_json
+
+
+class PointsLedger:
+    """Append-only points ledger with periodic compact snapshots.
+
+    Every balance change is appended to ``log_path`` as one JSON line.
+    The log is fsynced in groups (every ``fsync_every`` records or
+    ``fsync_interval`` seconds) and folded into a snapshot at
+    ``snapshot_path`` every ``snapshot_every`` records. On startup the
+    snapshot is loaded and the log is replayed on top of it.
+
+    ``balances`` is the live view the bot reads and updates; snapshots are
+    taken from a private copy that only append() advances, so appends may
+    run on a writer thread while the event loop keeps changing balances.
+    """
+
+    def __init__(self, snapshot_path="points.json", log_path="points.log",
+                 fsync_every=16, fsync_interval=1.0, snapshot_every=500):
+        self.snapshot_path = snapshot_path
+        self.log_path = log_path
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.snapshot_every = snapshot_every
+
+        self.balances = {}
+        self.seq = 0
+        self._durable = {}
+        self._lock = threading.RLock()
+        self._log = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._since_snapshot = 0
+
+    # ---------------------------
+    # Startup
+    # ---------------------------
+
+    def load(self):
+        """Load the snapshot, replay the log and return the balances dict."""
+        snapshot_seq = self._load_snapshot()
+        self.seq = snapshot_seq
+
+        if os.path.exists(self.log_path):
+            with open(self.log_path, "r+b") as f:
+                good_end = 0
+                for line in f:
+                    try:
+                        if not line.endswith(b"\n"):
+                            raise ValueError("no newline")
+                        record = json.loads(line)
+                    except ValueError:
+                        # A torn final line from a crash mid-append
+                        break
+                    good_end += len(line)
+                    if record["seq"] <= snapshot_seq:
+                        continue
+                    self._apply(record)
+                    self.seq = record["seq"]
+                    self._since_snapshot += 1
+
+                # Cut the torn tail off, or the next append would be glued
+                # to it and lost on the following replay
+                if good_end < os.fstat(f.fileno()).st_size:
+                    f.truncate(good_end)
+                    f.flush()
+                    os.fsync(f.fileno())
+
+        self._durable = dict(self.balances)
+        self._log = open(self.log_path, "a", encoding="utf-8")
+        return self.balances
+
+    def _load_snapshot(self):
+        if not os.path.exists(self.snapshot_path):
+            return 0
+        with open(self.snapshot_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        # Older points.json files are a bare {user_id: points} mapping
+        if "points" not in data:
+            self.balances.update(data)
+            return 0
+
+        self.balances.update(data["points"])
+        return data.get("seq", 0)
+
+    def _apply(self, record):
+        user_id = record["user"]
+        self.balances[user_id] = self.balances.get(user_id, 0) + record["delta"]
+
+    # ---------------------------
+    # Writes
+    # ---------------------------
+
+    def record(self, user_id, delta, reason=None):
+        """Apply and append one balance change, returning the user's new total."""
+        self.balances[user_id] = self.balances.get(user_id, 0) + delta
+        self.append([(user_id, delta, reason)])
+        return self.balances[user_id]
+
+    def append(self, changes):
+        """Append (user_id, delta, reason) changes already applied to balances.
+
+        The whole batch goes out in one write, so a burst of commands costs
+        a single append and at most one fsync.
+        """
+        now = int(time.time())
+        with self._lock:
+            # Built aside and committed only once the write succeeds, so a
+            # failed write (disk full) can be retried without counting twice
+            seq = self.seq
+            durable = dict(self._durable)
+            lines = []
+            for user_id, delta, reason in changes:
+                seq += 1
+                entry = {"seq": seq, "user": user_id, "delta": delta, "reason": reason, "ts": now}
+                lines.append(json.dumps(entry, separators=(",", ":")) + "\n")
+                durable[user_id] = durable.get(user_id, 0) + delta
+
+            start = self._log.tell()
+            try:
+                self._log.write("".join(lines))
+                self._log.flush()
+            except OSError:
+                self._reopen_log(start)
+                raise
+            self.seq = seq
+            self._durable = durable
+            self._unsynced += len(lines)
+            self._since_snapshot += len(lines)
+
+            if (self._unsynced >= self.fsync_every
+                    or time.monotonic() - self._last_sync >= self.fsync_interval):
+                self.sync()
+
+            if self._since_snapshot >= self.snapshot_every:
+                self.snapshot()
+
+    def _reopen_log(self, size):
+        """Cut the log back to ``size`` bytes after a failed write, so the
+        retry isn't glued onto a partial record."""
+        try:
+            self._log.close()
+        except OSError:
+            pass  # the unwritten buffer is dropped with it
+        os.truncate(self.log_path, size)
+        self._log = open(self.log_path, "a", encoding="utf-8")
+
+    def sync(self):
+        """fsync any appended records that are not yet on disk."""
+        with self._lock:
+            if self._log is None or self._unsynced == 0:
+                return
+            self._log.flush()
+            os.fsync(self._log.fileno())
+            self._unsynced = 0
+            self._last_sync = time.monotonic()
+
+    def sync_due(self):
+        """sync() once unsynced records have waited ``fsync_interval``.
+
+        Called on a timer, so a burst followed by silence still reaches the
+        disk without waiting for the next append.
+        """
+        with self._lock:
+            if self._unsynced and time.monotonic() - self._last_sync >= self.fsync_interval:
+                self.sync()
+
+    def snapshot(self):
+        """Write a compact snapshot atomically and truncate the log."""
+        with self._lock:
+            self.sync()
+            write_json(self.snapshot_path, {"seq": self.seq, "points": self._durable})
+
+            # Records up to self.seq are now in the snapshot; if we crash before
+            # the truncate below, replay skips them by sequence number.
+            if self._log is not None:
+                self._log.close()
+            self._log = open(self.log_path, "w", encoding="utf-8")
+            self._since_snapshot = 0
+
+    def replace(self, balances):
+        """Overwrite every balance at once (used for bulk resets)."""
+        with self._lock:
+            self.balances.clear()
+            self.balances.update(balances)
+            self._durable = dict(balances)
+            self.snapshot()
+
+    def close(self):
+        with self._lock:
+            if self._log is None:
+                return
+            self.sync()
+            self._log.close()
+            self._log = None
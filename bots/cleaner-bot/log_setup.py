@@ -0,0 +1,75 @@
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+from datetime import datetime, timezone
+
+
+# Extra fields callers may attach with logger.info(..., extra={...})
+STRUCTURED_FIELDS = ("user", "command", "chore", "points", "latency_ms", "router_result")
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message and extras."""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for field in STRUCTURED_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif getattr(record, "exc", None):
+            entry["exc"] = record.exc
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class StructuredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that keeps the traceback as its own field.
+
+    The stock prepare() formats the traceback into ``msg`` and drops
+    exc_info (it can't be pickled), so JsonFormatter never saw it. Here it
+    is formatted into ``record.exc`` instead, before the record is queued.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+            record.exc_text = None
+        return record
+
+
+def setup_logging(path="bot.log", level=logging.INFO, max_bytes=5_000_000, backups=5):
+    """Send all logging through a queue to a size-rotated JSON log file.
+
+    Callers only pay for a queue put; the file write happens on the
+    listener's thread. Returns the started QueueListener so it can be
+    stopped (and drained) on shutdown.
+    """
+    file_handler = logging.handlers.RotatingFileHandler(
+        path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8"
+    )
+    file_handler.setFormatter(JsonFormatter())
+
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+
+    root = logging.getLogger()
+    root.handlers[:] = [StructuredQueueHandler(log_queue)]
+    root.setLevel(level)
+
+    listener.start()
+    return listener
@@ -0,0 +1,136 @@
+import asyncio
+import functools
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+from atomic_file import write_json
+
+
+# Latency buckets grow by ~10% from 0.1 ms, which keeps percentile error
+# under 10% while recording stays O(1)
+_BUCKET_BASE = 0.0001
+_BUCKET_GROWTH = 1.1
+_BUCKET_COUNT = 200
+
+
+class Histogram:
+    """Fixed log-scale latency histogram with percentile estimates."""
+
+    def __init__(self):
+        self.buckets = [0] * _BUCKET_COUNT
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        if seconds <= _BUCKET_BASE:
+            index = 0
+        else:
+            index = int(math.log(seconds / _BUCKET_BASE, _BUCKET_GROWTH)) + 1
+        self.buckets[min(index, _BUCKET_COUNT - 1)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, p):
+        """Upper bound of the bucket holding the p-th percentile, in seconds."""
+        if self.count == 0:
+            return 0.0
+        target = math.ceil(self.count * p / 100)
+        seen = 0
+        for index, n in enumerate(self.buckets):
+            seen += n
+            if seen >= target:
+                return min(_BUCKET_BASE * _BUCKET_GROWTH ** index, self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "mean_ms": round(1000 * self.total / self.count, 2) if self.count else 0.0,
+            "p50_ms": round(1000 * self.percentile(50), 2),
+            "p95_ms": round(1000 * self.percentile(95), 2),
+            "p99_ms": round(1000 * self.percentile(99), 2),
+            "max_ms": round(1000 * self.max, 2),
+        }
+
+
+class Metrics:
+    """In-memory latency histograms, error counts and gauges.
+
+    Safe to record from the event loop and from worker threads.
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self._histograms = {}
+        self._gauges = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, seconds, error=False):
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.observe(seconds)
+            if error:
+                histogram.errors += 1
+
+    @contextmanager
+    def timer(self, name):
+        started = time.perf_counter()
+        error = False
+        try:
+            yield
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - started, error)
+
+    def timed(self, name):
+        """Decorator recording the latency of a sync or async function."""
+        def decorator(func):
+            if asyncio.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    with self.timer(name):
+                        return await func(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timer(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def gauge(self, name, read):
+        """Register a zero-argument callable sampled on every snapshot."""
+        self._gauges[name] = read
+
+    def snapshot(self):
+        with self._lock:
+            latencies = {name: h.summary() for name, h in sorted(self._histograms.items())}
+        gauges = {}
+        for name, read in sorted(self._gauges.items()):
+            try:
+                gauges[name] = read()
+            except Exception:
+                gauges[name] = None
+        return {
+            "uptime_s": int(time.time() - self.started),
+            "latency": latencies,
+            "gauges": gauges,
+        }
+
+    def dump(self, path):
+        """Write a snapshot to ``path`` atomically."""
+        write_json(path, self.snapshot(), indent=2)
+
+
+metrics = Metrics()
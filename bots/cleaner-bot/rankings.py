@@ -0,0 +1,115 @@
+import json
+import os
+from bisect import bisect_left, insort
+from datetime import datetime
+
+from atomic_file import write_json
+
+
+class Leaderboard:
+    """Balances kept sorted highest first, updated one transaction at a time.
+
+    The index is a sorted list of ``(-points, user_id)``, so a change costs a
+    bisect plus one list insert/delete and reading the top N is a slice;
+    nothing re-sorts the whole balance dict. Users at zero are left out.
+    """
+
+    def __init__(self, balances=None):
+        self._ranked = []
+        self._points = {}
+        self.rebuild(balances or {})
+
+    def rebuild(self, balances):
+        """Index ``balances`` from scratch, e.g. after a reset."""
+        self._points = {user_id: pts for user_id, pts in balances.items() if pts}
+        self._ranked = sorted((-pts, user_id) for user_id, pts in self._points.items())
+
+    def update(self, user_id, balance):
+        old = self._points.pop(user_id, None)
+        if old is not None:
+            del self._ranked[bisect_left(self._ranked, (-old, user_id))]
+        if balance:
+            self._points[user_id] = balance
+            insort(self._ranked, (-balance, user_id))
+
+    def apply(self, txn):
+        """TransactionPipeline.on_applied hook."""
+        self.update(txn.user_id, txn.balance)
+
+    def top(self, count=10):
+        """[(user_id, points)] for the ``count`` highest balances."""
+        return [(user_id, -neg) for neg, user_id in self._ranked[:count]]
+
+    def rank(self, user_id):
+        """1-based position of ``user_id``, or None if they have no points."""
+        points = self._points.get(user_id)
+        if points is None:
+            return None
+        return bisect_left(self._ranked, (-points, user_id)) + 1
+
+    def __len__(self):
+        return len(self._ranked)
+
+
+# Period name -> function giving the bucket a moment falls in
+PERIODS = {
+    "today": lambda moment: moment.strftime("%Y-%m-%d"),
+    "week": lambda moment: "{}-W{:02d}".format(*moment.isocalendar()[:2]),
+    "month": lambda moment: moment.strftime("%Y-%m"),
+    "all": lambda moment: "all",
+}
+
+
+class PeriodStats:
+    """Per-chore totals for the current day, week, month and all time.
+
+    Every transaction adds to one bucket per period, keyed by its reason:
+    ``buckets[period][bucket][reason] = [count, points]``. Reading a period
+    is a dict lookup, however long the history. Only the latest ``keep``
+    buckets of each period are kept. The totals are saved to ``path``
+    (atomically) by save() and read back by load().
+    """
+
+    def __init__(self, path, keep=8):
+        self.path = path
+        self.keep = keep
+        self.buckets = {period: {} for period in PERIODS}
+        self._dirty = False
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            saved = json.load(f)
+        for period in PERIODS:
+            self.buckets[period] = saved.get(period, {})
+
+    def save(self):
+        if not self._dirty:
+            return
+        self._dirty = False
+        write_json(self.path, self.buckets)
+
+    def record(self, reason, points, moment=None):
+        moment = moment or datetime.now()
+        for period, bucket_of in PERIODS.items():
+            buckets = self.buckets[period]
+            bucket = bucket_of(moment)
+            if bucket not in buckets:
+                buckets[bucket] = {}
+                # Bucket names sort chronologically; drop the oldest ones
+                for old in sorted(buckets)[:-self.keep]:
+                    del buckets[old]
+            totals = buckets[bucket].setdefault(reason, [0, 0])
+            totals[0] += 1
+            totals[1] += points
+        self._dirty = True
+
+    def apply(self, txn):
+        """TransactionPipeline.on_applied hook."""
+        self.record(txn.reason or "manual", txn.delta)
+
+    def totals(self, period, moment=None):
+        """(bucket name, {reason: [count, points]}) for the current ``period``."""
+        bucket = PERIODS[period](moment or datetime.now())
+        return bucket, self.buckets[period].get(bucket, {})
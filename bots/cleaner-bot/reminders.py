@@ -0,0 +1,187 @@
+import heapq
+import logging
+import time
+from datetime import datetime, timedelta
+
+import pytz
+
+from config_store import ConfigStore
+from timer_heap import TimerHeap
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEZONE = "America/Chicago"
+
+# (name, lowest, highest) for the five cron fields
+CRON_FIELDS = [("minute", 0, 59), ("hour", 0, 23), ("day", 1, 31), ("month", 1, 12), ("weekday", 0, 7)]
+
+
+class CronSchedule:
+    """A standard five-field cron spec: "minute hour day month weekday".
+
+    Fields take ``*``, numbers, ``a-b`` ranges, ``/step`` and comma lists;
+    weekday 0 and 7 are both Sunday. As in cron, when both day and weekday
+    are restricted (neither starts with ``*``) a day matching either one
+    fires. A ``CRON_TZ=Area/City``
+    prefix sets the timezone, which otherwise defaults to ``timezone``.
+    """
+
+    def __init__(self, spec, timezone=DEFAULT_TIMEZONE):
+        fields = spec.split()
+        if fields and fields[0].startswith("CRON_TZ="):
+            timezone = fields.pop(0)[len("CRON_TZ="):]
+        if len(fields) != 5:
+            raise ValueError(f"expected 5 cron fields, got {len(fields)}: {spec!r}")
+        try:
+            self.tz = pytz.timezone(timezone)
+        except pytz.UnknownTimeZoneError:
+            raise ValueError(f"unknown timezone {timezone!r}") from None
+
+        self.spec = " ".join(fields)
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            _parse_field(text, name, low, high) for text, (name, low, high) in zip(fields, CRON_FIELDS)
+        )
+        self.weekdays = {day % 7 for day in weekdays}
+        # cron treats "*" and "*/n" alike here: only a field that doesn't
+        # start with "*" restricts the day
+        self._any_day = fields[2].startswith("*")
+        self._any_weekday = fields[4].startswith("*")
+
+    @property
+    def timezone(self):
+        return self.tz.zone
+
+    def next_after(self, moment):
+        """First firing time strictly after ``moment`` (unix time), as unix time."""
+        local = datetime.fromtimestamp(moment, self.tz).replace(tzinfo=None)
+        start = local.replace(second=0, microsecond=0) + timedelta(minutes=1)
+
+        day = start.date()
+        # Any valid spec fires within a few years (Feb 29 needs a leap year)
+        for _ in range(366 * 8):
+            if self._day_matches(day):
+                first_day = day == start.date()
+                for hour in self.hours:
+                    if first_day and hour < start.hour:
+                        continue
+                    for minute in self.minutes:
+                        if first_day and hour == start.hour and minute < start.minute:
+                            continue
+                        naive = datetime(day.year, day.month, day.day, hour, minute)
+                        fire = self.tz.normalize(self.tz.localize(naive)).timestamp()
+                        if fire > moment:
+                            return fire
+            day += timedelta(days=1)
+        raise ValueError(f"cron spec {self.spec!r} never fires")
+
+    def _day_matches(self, day):
+        if day.month not in self.months:
+            return False
+        day_ok = day.day in self.days
+        weekday_ok = (day.weekday() + 1) % 7 in self.weekdays  # cron counts from Sunday
+        if self._any_day or self._any_weekday:
+            return day_ok and weekday_ok
+        return day_ok or weekday_ok
+
+
+def _parse_field(text, name, low, high):
+    values = set()
+    for part in text.split(","):
+        base, _, step = part.partition("/")
+        if base == "*":
+            start, stop = low, high
+        elif "-" in base:
+            start, stop = (int(value) for value in base.split("-", 1))
+        else:
+            start = stop = int(base)
+            if step:
+                stop = high
+        step = int(step) if step else 1
+        if not (low <= start <= stop <= high) or step < 1:
+            raise ValueError(f"bad cron {name} field {text!r}")
+        values.update(range(start, stop + 1, step))
+    return sorted(values)
+
+
+class ReminderScheduler(TimerHeap):
+    """Every channel reminder, driven by one timer task.
+
+    Reminders live in ``path`` as a JSON list of {id, schedule, channel_id,
+    message, timezone} and are edited through add()/remove(). Their next
+    firing times sit in one heap, and a single task sleeps until the
+    earliest is due, so dozens of reminders still cost one sleeping task.
+    Removed or replaced reminders are skipped when their heap entry comes
+    up instead of being searched for.
+
+    ``send(channel_id, message)`` is an async callable.
+    """
+
+    def __init__(self, path, send, defaults=()):
+        super().__init__()
+        self._config = ConfigStore(path, {"reminders": list(defaults)})
+        self._send = send
+
+        self.reminders = {}
+        self._schedules = {}
+
+    def load(self):
+        for entry in self._config.get()["reminders"]:
+            try:
+                self._activate(entry)
+            except ValueError as e:
+                logger.error(f"skipping reminder {entry.get('id')}: {e}")
+
+    def add(self, schedule, channel_id, message, timezone=DEFAULT_TIMEZONE):
+        """Save and schedule a new reminder. Returns it; raises ValueError on a bad spec."""
+        entry = {
+            "id": max(self.reminders, default=0) + 1,
+            "schedule": schedule,
+            "channel_id": channel_id,
+            "message": message,
+            "timezone": timezone,
+        }
+        self._activate(entry)
+        self._save()
+        self._wake()
+        return self.reminders[entry["id"]]
+
+    def remove(self, reminder_id):
+        if self.reminders.pop(reminder_id, None) is None:
+            return False
+        # Its heap entry is dropped when it comes up
+        self._schedules.pop(reminder_id)
+        self._save()
+        return True
+
+    def next_run(self, reminder_id):
+        """Unix time the reminder fires next, or None if it doesn't exist."""
+        for fire_at, _, entry_id, schedule in self._heap:
+            if entry_id == reminder_id and self._schedules.get(reminder_id) is schedule:
+                return fire_at
+        return None
+
+    def _activate(self, entry):
+        schedule = CronSchedule(entry["schedule"], entry.get("timezone") or DEFAULT_TIMEZONE)
+        fire_at = schedule.next_after(time.time())  # raises if it never fires
+        entry["timezone"] = schedule.timezone
+        self.reminders[entry["id"]] = entry
+        self._schedules[entry["id"]] = schedule
+        self._push(fire_at, entry["id"], schedule)
+
+    def _save(self):
+        self._config.save({"reminders": sorted(self.reminders.values(), key=lambda entry: entry["id"])})
+
+    async def _fire(self):
+        fire_at, _, reminder_id, schedule = heapq.heappop(self._heap)
+        if self._schedules.get(reminder_id) is not schedule:
+            return  # removed since it was scheduled
+        # After a stall (sleep, long send) skip the missed runs instead
+        # of firing them all at once
+        self._push(schedule.next_after(max(fire_at, time.time())), reminder_id, schedule)
+
+        entry = self.reminders[reminder_id]
+        try:
+            await self._send(entry["channel_id"], entry["message"])
+        except Exception as e:
+            logger.error(f"reminder {reminder_id} failed: {e}")
@@ -0,0 +1,302 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import metrics
+
+
+logger = logging.getLogger(__name__)
+
+
+# Seconds to wait for the router to report a new state, per band (keyed by
+# Connection value so tplinkrouterc6u is only imported once a router is used)
+DEFAULT_VERIFY_TIMEOUTS = {
+    "guest_2g": 10.0,
+    "guest_5g": 15.0,
+    "guest_6g": 15.0,
+}
+
+
+def status_field(band):
+    """Name of the Status attribute holding ``band``'s on/off state."""
+    name = band.value
+    if name.startswith("host_"):
+        name = "wifi_" + name[len("host_"):]
+    return f"{name}_enable"
+
+
+class RouterSession:
+    """Keeps one authorized TP-Link session alive between toggles.
+
+    The first call logs in; later calls reuse the session until it is older
+    than ``max_age`` seconds or a request fails, in which case we log in
+    again and retry once. close() always logs out.
+
+    ``band`` is the default for calls that don't name one (guest 5 GHz if
+    not given); a router with several bands to control still needs only
+    this one session. ``client_factory(host, password)`` builds the client;
+    it defaults to TplinkRouterProvider.get_client and is swapped out by the
+    benchmarks. Nothing touches the network until the first call.
+    """
+
+    def __init__(self, host, password, band=None, max_age=600,
+                 verify_timeout=None, client_factory=None):
+        self.host = host
+        self.password = password
+        self.band = band
+        self.max_age = max_age
+        self.client_factory = client_factory
+        # None means "use DEFAULT_VERIFY_TIMEOUTS for the band"
+        self.verify_timeout = verify_timeout
+
+        self._client = None
+        self._authorized_at = None
+        self._lock = threading.Lock()
+
+    def set_wifi(self, state, band=None):
+        """Toggle a band, raising if the router rejects the request."""
+        band = band or self.band or _connection("guest_5g")
+        with self._lock:
+            return self._call("router.set_wifi", lambda client: client.set_wifi(band, state))
+
+    def get_status(self):
+        with self._lock:
+            return self._call("router.get_status", lambda client: client.get_status())
+
+    def timeout_for(self, band=None):
+        if self.verify_timeout is not None:
+            return self.verify_timeout
+        band = band or self.band
+        return DEFAULT_VERIFY_TIMEOUTS.get(getattr(band, "value", None), 15.0)
+
+    def wait_for_state(self, state, band=None, timeout=None, first_delay=0.25, max_delay=2.0):
+        """Poll the band's status with exponential backoff until it equals ``state``.
+
+        Returns True as soon as the router reports the target state, or
+        False once ``timeout`` seconds (default: timeout_for(band)) pass.
+        """
+        bands = [band or self.band or _connection("guest_5g")]
+        return not self.wait_for_bands(state, bands, timeout, first_delay, max_delay)
+
+    def wait_for_bands(self, state, bands, timeout=None, first_delay=0.25, max_delay=2.0):
+        """Like wait_for_state for several bands, sharing one status read per poll.
+
+        Returns the bands that still had not reached ``state`` at the deadline.
+        """
+        if timeout is None:
+            timeout = max(self.timeout_for(band) for band in bands)
+        deadline = time.monotonic() + timeout
+        waiting = set(bands)
+        delay = first_delay
+
+        while True:
+            time.sleep(min(delay, max(0.0, deadline - time.monotonic())))
+            try:
+                status = self.get_status()
+                waiting = {band for band in waiting if getattr(status, status_field(band)) != state}
+            except Exception as e:
+                logger.warning(f"router status check failed: {e}")
+
+            if not waiting or time.monotonic() >= deadline:
+                return waiting
+            delay = min(delay * 2, max_delay)
+
+    def close(self):
+        with self._lock:
+            self._logout()
+
+    def _call(self, name, request):
+        for attempt in (1, 2):
+            try:
+                client = self._session()
+                with metrics.timer(name):
+                    return request(client)
+            except Exception as e:
+                logger.warning(f"router request failed (attempt {attempt}): {e}")
+                self._logout()
+                if attempt == 2:
+                    raise
+
+    def _session(self):
+        if self._client is None:
+            if self.client_factory is None:
+                from tplinkrouterc6u import TplinkRouterProvider
+                self.client_factory = TplinkRouterProvider.get_client
+            # get_client probes the router to pick the right client class
+            self._client = self.client_factory(self.host, self.password)
+
+        expired = (self._authorized_at is None
+                   or time.monotonic() - self._authorized_at > self.max_age)
+        if expired:
+            with metrics.timer("router.authorize"):
+                self._client.authorize()
+            self._authorized_at = time.monotonic()
+        return self._client
+
+    def _logout(self):
+        if self._client is None or self._authorized_at is None:
+            return
+        try:
+            with metrics.timer("router.logout"):
+                self._client.logout()
+        except Exception as e:
+            logger.warning(f"router logout failed: {e}")
+        self._authorized_at = None
+
+
+class RouterGroup:
+    """Toggles a set of (router, band) targets in parallel.
+
+    ``targets`` maps each RouterSession to the bands it should switch. Each
+    router is handled on its own thread (its bands one after another, since
+    they share a session), so a toggle takes about as long as the slowest
+    router rather than the sum of them.
+    """
+
+    def __init__(self, targets):
+        self.targets = targets
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, len(targets)), thread_name_prefix="router-fanout"
+        )
+
+    def toggle(self, state):
+        """Switch every target and verify it. Returns {"host/band": result}.
+
+        Each result is "ok", "timeout" (the router never reported the new
+        state) or "error" (the request itself failed).
+        """
+        jobs = [
+            self._executor.submit(self._toggle_router, session, bands, state)
+            for session, bands in self.targets.items()
+        ]
+        results = {}
+        for job in jobs:
+            results.update(job.result())
+        return results
+
+    def close(self):
+        for session in self.targets:
+            session.close()
+        self._executor.shutdown(wait=True)
+
+    def _toggle_router(self, session, bands, state):
+        results = {}
+        for band in bands:
+            try:
+                session.set_wifi(state, band)
+            except Exception as e:
+                logger.error(f"{session.host} {band.value}: set_wifi failed: {e}")
+                results[f"{session.host}/{band.value}"] = "error"
+
+        # Verify after all bands were switched so their convergence overlaps,
+        # reading the status once per poll for all of them
+        switched = [band for band in bands if f"{session.host}/{band.value}" not in results]
+        if switched:
+            stuck = session.wait_for_bands(state, switched)
+            for band in switched:
+                results[f"{session.host}/{band.value}"] = "timeout" if band in stuck else "ok"
+        return results
+
+
+def parse_targets(spec, password, client_factory=None):
+    """Parse ROUTER_TARGETS, e.g. "192.168.0.1=guest_2g+guest_5g,192.168.0.2=guest_5g".
+
+    Every router uses ``password`` (mesh units share the admin password).
+    Returns the RouterGroup targets mapping.
+    """
+    targets = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        host, _, bands = item.partition("=")
+        session = RouterSession(host.strip(), password, client_factory=client_factory)
+        targets[session] = [_connection(band.strip().lower()) for band in bands.split("+") if band.strip()]
+        if not targets[session]:
+            raise ValueError(f"no bands given for router {host!r}")
+    return targets
+
+
+def _connection(value):
+    """The tplinkrouterc6u Connection for a band name such as "guest_5g"."""
+    from tplinkrouterc6u import Connection
+    return Connection(value)
+
+
+class _Toggle:
+    def __init__(self, state, future):
+        self.state = state
+        self.futures = [future]
+
+
+class RouterWorker:
+    """Runs router toggles one at a time on a dedicated thread.
+
+    Requests go through a single-consumer asyncio queue. A request for the
+    same state as the last one still waiting is coalesced with it, and
+    every caller gets that toggle's result; a different state is queued
+    behind it, so nobody is told their state was set when it wasn't.
+    """
+
+    def __init__(self, toggle):
+        self._toggle = toggle
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="router")
+        self._queue = None
+        self._waiting = None
+        self._task = None
+
+    def submit(self, state):
+        """Queue a toggle and return a future resolving to its success flag."""
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+
+        if self._waiting is not None and self._waiting.state == state:
+            self._waiting.futures.append(future)
+        else:
+            self._waiting = _Toggle(state, future)
+            self._queue.put_nowait(self._waiting)
+        return future
+
+    async def set_wifi(self, state):
+        return await self.submit(state)
+
+    def run(self, func, *args):
+        """Run any other router call on the worker thread."""
+        return asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    @property
+    def queue_depth(self):
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._executor.shutdown(wait=True)
+
+    def _ensure_started(self):
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.get_running_loop().create_task(self._consume())
+
+    async def _consume(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            request = await self._queue.get()
+            if self._waiting is request:
+                # From here on new requests start a fresh toggle
+                self._waiting = None
+
+            try:
+                with metrics.timer("router.toggle"):
+                    result = await loop.run_in_executor(self._executor, self._toggle, request.state)
+            except Exception as e:
+                logger.error(f"router toggle crashed: {e}")
+                result = False
+
+            for future in request.futures:
+                if not future.done():
+                    future.set_result(result)
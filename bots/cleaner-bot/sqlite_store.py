@@ -0,0 +1,136 @@
+import sqlite3
+import threading
+import time
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS balances (
+    user_id TEXT PRIMARY KEY,
+    points  INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS transactions (
+    id      INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    delta   INTEGER NOT NULL,
+    reason  TEXT,
+    ts      INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_transactions_user_ts
+    ON transactions (user_id, ts);
+"""
+
+# Kept as constants so sqlite3's statement cache reuses the prepared form
+INSERT_TRANSACTION = "INSERT INTO transactions (user_id, delta, reason, ts) VALUES (?, ?, ?, ?)"
+UPSERT_BALANCE = (
+    "INSERT INTO balances (user_id, points) VALUES (?, ?) "
+    "ON CONFLICT(user_id) DO UPDATE SET points = excluded.points"
+)
+ADD_BALANCE = (
+    "INSERT INTO balances (user_id, points) VALUES (?, ?) "
+    "ON CONFLICT(user_id) DO UPDATE SET points = points + excluded.points"
+)
+SELECT_BALANCES = "SELECT user_id, points FROM balances"
+SELECT_HISTORY = (
+    "SELECT delta, reason, ts FROM transactions "
+    "WHERE user_id = ? AND ts >= ? ORDER BY ts DESC, id DESC LIMIT ?"
+)
+
+
+class SqlitePointsStore:
+    """SQLite points store: one row per transaction plus a balance table.
+
+    Exposes the same load/record/append/replace/sync/close interface as
+    PointsLedger. Balances are cached in memory, so reads never touch the
+    database; per-user history is served from the (user_id, ts) index.
+    The connection is shared between threads behind a lock.
+    """
+
+    def __init__(self, path="points.db"):
+        self.path = path
+        self.balances = {}
+        self._db = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        self._db = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+
+        self.balances.update(self._db.execute(SELECT_BALANCES).fetchall())
+        return self.balances
+
+    def record(self, user_id, delta, reason=None):
+        """Apply and store one transaction, returning the new total."""
+        self.balances[user_id] = self.balances.get(user_id, 0) + delta
+        self.append([(user_id, delta, reason)])
+        return self.balances[user_id]
+
+    def append(self, changes):
+        """Store (user_id, delta, reason) changes already applied to balances.
+
+        The batch is written in a single SQLite transaction.
+        """
+        now = int(time.time())
+        with self._lock, self._transaction():
+            self._db.executemany(INSERT_TRANSACTION, [
+                (user_id, delta, reason, now) for user_id, delta, reason in changes
+            ])
+            self._db.executemany(ADD_BALANCE, [
+                (user_id, delta) for user_id, delta, _ in changes
+            ])
+
+    def replace(self, balances):
+        """Set every balance at once, logging the adjustments as transactions."""
+        now = int(time.time())
+        with self._lock, self._transaction():
+            for user_id, new_total in balances.items():
+                delta = new_total - self.balances.get(user_id, 0)
+                if delta:
+                    self._db.execute(INSERT_TRANSACTION, (user_id, delta, "reset", now))
+                self._db.execute(UPSERT_BALANCE, (user_id, new_total))
+        self.balances.clear()
+        self.balances.update(balances)
+
+    def import_balances(self, balances):
+        """Add existing balances (e.g. from the ledger files) as "import" transactions."""
+        changes = [(user_id, total, "import") for user_id, total in balances.items() if total]
+        for user_id, total, _ in changes:
+            self.balances[user_id] = self.balances.get(user_id, 0) + total
+        self.append(changes)
+
+    def history(self, user_id, limit=10, since=0):
+        """Return the user's most recent (delta, reason, ts) rows, newest first."""
+        with self._lock:
+            return self._db.execute(SELECT_HISTORY, (user_id, since, limit)).fetchall()
+
+    def sync(self):
+        # Every record() commits its own transaction
+        pass
+
+    def sync_due(self):
+        pass
+
+    def close(self):
+        with self._lock:
+            if self._db is None:
+                return
+            self._db.close()
+            self._db = None
+
+    def _transaction(self):
+        return _Transaction(self._db)
+
+
+class _Transaction:
+    """BEGIN/COMMIT around a block, ROLLBACK if it raises."""
+
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        self.db.execute("BEGIN")
+
+    def __exit__(self, exc_type, exc, tb):
+        self.db.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
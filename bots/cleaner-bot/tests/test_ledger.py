@@ -0,0 +1,118 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ledger import PointsLedger  # noqa: E402
+
+
+def open_ledger(tmp_path):
+    ledger = PointsLedger(str(tmp_path / "points.json"), str(tmp_path / "points.log"))
+    ledger.load()
+    return ledger
+
+
+def test_replay_restores_balances(tmp_path):
+    ledger = open_ledger(tmp_path)
+    ledger.record("1", 10)
+    ledger.record("1", -3)
+    ledger.record("2", 4)
+    ledger.close()
+
+    assert open_ledger(tmp_path).balances == {"1": 7, "2": 4}
+
+
+def test_torn_line_is_cut_before_new_appends(tmp_path):
+    ledger = open_ledger(tmp_path)
+    ledger.record("1", 15)
+    ledger.close()
+
+    # Crash halfway through writing the next record
+    with open(tmp_path / "points.log", "a", encoding="utf-8") as f:
+        f.write('{"seq":2,"user":"1","del')
+
+    ledger = open_ledger(tmp_path)
+    assert ledger.balances == {"1": 15}
+    ledger.record("1", 7)
+    ledger.record("1", 1)
+    ledger.close()
+
+    assert open_ledger(tmp_path).balances == {"1": 23}
+
+
+def test_record_without_newline_counts_as_torn(tmp_path):
+    ledger = open_ledger(tmp_path)
+    ledger.record("1", 5)
+    ledger.close()
+
+    with open(tmp_path / "points.log", "a", encoding="utf-8") as f:
+        f.write('{"seq":2,"user":"1","delta":2,"reason":null,"ts":0}')
+
+    ledger = open_ledger(tmp_path)
+    ledger.record("1", 1)
+    ledger.close()
+
+    assert open_ledger(tmp_path).balances == {"1": 6}
+
+
+def test_snapshot_then_replay(tmp_path):
+    ledger = PointsLedger(str(tmp_path / "points.json"), str(tmp_path / "points.log"), snapshot_every=2)
+    ledger.load()
+    for _ in range(5):
+        ledger.record("1", 1)
+    ledger.close()
+
+    assert open_ledger(tmp_path).balances == {"1": 5}
+
+
+def test_sync_due_fsyncs_a_quiet_burst(tmp_path):
+    ledger = PointsLedger(str(tmp_path / "points.json"), str(tmp_path / "points.log"),
+                          fsync_every=100, fsync_interval=0.05)
+    ledger.load()
+    ledger.record("1", 1)
+    ledger.record("1", 1)
+    ledger.sync_due()
+    assert ledger._unsynced == 2
+
+    time.sleep(0.06)
+    ledger.sync_due()
+    assert ledger._unsynced == 0
+    ledger.close()
+
+
+class FailingWrites:
+    """Wraps the log file and fails the next ``failures`` writes like a full disk."""
+
+    def __init__(self, f, failures=1):
+        self.f = f
+        self.failures = failures
+
+    def write(self, data):
+        if self.failures:
+            self.failures -= 1
+            self.f.write(data[: len(data) // 2])
+            raise OSError(28, "No space left on device")
+        return self.f.write(data)
+
+    def __getattr__(self, name):
+        return getattr(self.f, name)
+
+
+def test_failed_write_is_retried_once(tmp_path):
+    ledger = open_ledger(tmp_path)
+    ledger.record("1", 5)
+    ledger._log = FailingWrites(ledger._log)
+
+    batch = [("1", 3, "chore"), ("2", 2, "chore")]
+    ledger.balances["1"] += 3
+    ledger.balances["2"] = 2
+    try:
+        ledger.append(batch)
+    except OSError:
+        pass
+    ledger.append(batch)  # the write-behind retry
+    ledger.snapshot()
+    ledger.close()
+
+    assert open_ledger(tmp_path).balances == {"1": 8, "2": 2}
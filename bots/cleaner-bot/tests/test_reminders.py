@@ -0,0 +1,41 @@
+import os
+import sys
+from datetime import datetime
+
+import pytest
+import pytz
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reminders import CronSchedule  # noqa: E402
+
+CHICAGO = pytz.timezone("America/Chicago")
+
+
+def next_run(spec, start):
+    fire = CronSchedule(spec).next_after(CHICAGO.localize(start).timestamp())
+    return datetime.fromtimestamp(fire, CHICAGO).replace(tzinfo=None)
+
+
+def test_weekday_list():
+    # 2026-10-18 is a Sunday
+    assert next_run("0 16 * * 1,3,5", datetime(2026, 10, 18, 10)) == datetime(2026, 10, 19, 16)
+
+
+def test_day_or_weekday_when_both_restricted():
+    assert next_run("0 9 1 * 3", datetime(2026, 10, 18, 10)) == datetime(2026, 10, 21, 9)
+
+
+def test_stepped_star_day_does_not_count_as_restricted():
+    # Tuesdays on odd days of the month: Oct 20 is even, Oct 27 is odd
+    assert next_run("0 9 */2 * 2", datetime(2026, 10, 18, 10)) == datetime(2026, 10, 27, 9)
+
+
+def test_dst_gap_moves_to_the_next_valid_time():
+    assert next_run("30 2 * * *", datetime(2026, 3, 8, 0)) == datetime(2026, 3, 8, 3, 30)
+
+
+@pytest.mark.parametrize("spec", ["0 16 * *", "61 * * * *", "0 0 31 2 *", "CRON_TZ=Nowhere/Else 0 0 * * *"])
+def test_bad_specs_raise(spec):
+    with pytest.raises(ValueError):
+        CronSchedule(spec).next_after(0)
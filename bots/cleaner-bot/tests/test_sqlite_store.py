@@ -0,0 +1,19 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlite_store import SqlitePointsStore  # noqa: E402
+
+
+def test_import_balances_survives_reload(tmp_path):
+    store = SqlitePointsStore(str(tmp_path / "points.db"))
+    store.load()
+    store.import_balances({"1": 40, "2": 0})
+    store.record("1", 5)
+    assert store.history("1")[-1][:2] == (40, "import")
+    store.close()
+
+    store = SqlitePointsStore(str(tmp_path / "points.db"))
+    assert store.load() == {"1": 45}
+    store.close()
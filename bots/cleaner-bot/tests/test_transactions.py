@@ -0,0 +1,70 @@
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transactions import InsufficientPoints, TransactionPipeline  # noqa: E402
+
+
+class MemoryStore:
+    def __init__(self, balances):
+        self.balances = dict(balances)
+        self.appended = []
+
+    def append(self, changes):
+        self.appended.extend(changes)
+
+    def replace(self, balances):
+        self.balances.clear()
+        self.balances.update(balances)
+
+    def sync_due(self):
+        pass
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_concurrent_spends_cannot_overdraw():
+    async def go():
+        pipeline = TransactionPipeline(MemoryStore({"1": 40}))
+        results = await asyncio.gather(
+            pipeline.spend("1", 30), pipeline.spend("1", 30), return_exceptions=True
+        )
+        pipeline.close()
+        return pipeline, results
+
+    pipeline, results = run(go())
+    assert sum(isinstance(result, InsufficientPoints) for result in results) == 1
+    assert pipeline.balance("1") == 10
+
+
+def test_repeated_key_is_applied_once():
+    async def go():
+        pipeline = TransactionPipeline(MemoryStore({}))
+        first = await pipeline.earn("1", 5, "chore", key=123)
+        again = await pipeline.earn("1", 5, "chore", key=123)
+        pipeline.close()
+        return pipeline, first, again
+
+    pipeline, first, again = run(go())
+    assert not first.replayed and again.replayed
+    assert again.balance == 5 and pipeline.balance("1") == 5
+    assert pipeline.store.appended == [("1", 5, "chore")]
+
+
+def test_earn_during_replace_lands_after_it():
+    async def go():
+        pipeline = TransactionPipeline(MemoryStore({"1": 40, "2": 5}))
+        reset = asyncio.create_task(pipeline.replace({"1": 0, "2": 0}))
+        await asyncio.sleep(0)
+        txn = await pipeline.earn("1", 3, "chore")
+        await reset
+        pipeline.close()
+        return pipeline, txn
+
+    pipeline, txn = run(go())
+    assert txn.balance == 3
+    assert pipeline.store.balances == {"1": 3, "2": 0}
@@ -0,0 +1,71 @@
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from wifi_schedule import WifiScheduler  # noqa: E402
+
+
+class FakeWifi:
+    def __init__(self, notify_delay=0.0):
+        self.toggles = []
+        self.notices = []
+        self.notify_delay = notify_delay
+
+    async def set_wifi(self, state):
+        self.toggles.append(state)
+        return True
+
+    async def notify(self, channel_id, message):
+        self.notices.append(message)
+        await asyncio.sleep(self.notify_delay)
+
+
+def test_overlapping_sessions_turn_off_after_the_last(tmp_path):
+    async def go():
+        wifi = FakeWifi()
+        schedule = WifiScheduler(str(tmp_path / "wifi.json"), wifi.set_wifi, wifi.notify)
+        schedule.start()
+        schedule.add(time.time() + 0.05, "lunch", 1)
+        schedule.add(time.time() + 0.15, "break", 1)
+        await asyncio.sleep(0.1)
+        first = list(wifi.toggles)
+        await asyncio.sleep(0.15)
+        await schedule.stop()
+        return wifi, first, schedule
+
+    wifi, first, schedule = asyncio.run(go())
+    assert first == []
+    assert wifi.toggles == [False]
+    assert schedule.session_count == 0
+
+
+def test_session_added_during_expiry_notices_keeps_wifi_on(tmp_path):
+    async def go():
+        wifi = FakeWifi(notify_delay=0.1)
+        schedule = WifiScheduler(str(tmp_path / "wifi.json"), wifi.set_wifi, wifi.notify)
+        schedule.start()
+        schedule.add(time.time() + 0.02, "lunch", 1)
+        await asyncio.sleep(0.06)  # "time over" notice is being sent
+        schedule.add(time.time() + 10, "break", 1)
+        await asyncio.sleep(0.3)
+        await schedule.stop()
+        return wifi, schedule
+
+    wifi, schedule = asyncio.run(go())
+    assert wifi.toggles == []
+    assert schedule.session_count == 1
+
+
+def test_sessions_survive_a_restart(tmp_path):
+    async def go():
+        wifi = FakeWifi()
+        path = str(tmp_path / "wifi.json")
+        WifiScheduler(path, wifi.set_wifi, wifi.notify).add(time.time() + 60, "lunch", 1)
+        restarted = WifiScheduler(path, wifi.set_wifi, wifi.notify)
+        restarted.load()
+        return restarted
+
+    assert asyncio.run(go()).session_count == 1
@@ -0,0 +1,63 @@
+import asyncio
+import heapq
+import time
+
+
+class TimerHeap:
+    """A heap of timed entries and one task that sleeps until the earliest is due.
+
+    Entries are tuples ``(unix_time, seq, *fields)`` added with _push().
+    Whenever the top entry is due the task calls ``await self._fire()``,
+    which subclasses implement to pop and handle the due entries. Call
+    _wake() after changing the heap so the task re-checks its deadline.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._seq = 0
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _push(self, when, *fields):
+        """Add an entry and return its sequence number, unique per heap."""
+        self._seq += 1
+        heapq.heappush(self._heap, (when, self._seq, *fields))
+        return self._seq
+
+    def _wake(self):
+        self._wakeup.set()
+
+    async def _fire(self):
+        raise NotImplementedError
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            delay = self._heap[0][0] - time.time() if self._heap else None
+            if delay is None or delay > 0:
+                await self._sleep(delay)
+                continue
+            await self._fire()
+
+    async def _sleep(self, timeout):
+        # asyncio.wait rather than wait_for: before Python 3.12, wait_for
+        # can swallow a cancel that lands just as the event is set, and
+        # stop() then waits forever
+        waiter = asyncio.ensure_future(self._wakeup.wait())
+        try:
+            await asyncio.wait([waiter], timeout=timeout)
+        finally:
+            waiter.cancel()
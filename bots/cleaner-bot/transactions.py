@@ -0,0 +1,143 @@
+import asyncio
+import copy
+from collections import OrderedDict
+
+from write_behind import WriteBehind
+
+
+class InsufficientPoints(Exception):
+    def __init__(self, balance, amount):
+        super().__init__(f"balance {balance} is below {amount}")
+        self.balance = balance
+        self.amount = amount
+
+
+class Transaction:
+    """One earn (positive delta) or spend (negative delta) of points."""
+
+    def __init__(self, user_id, delta, reason):
+        self.user_id = user_id
+        self.delta = delta
+        self.reason = reason
+        self.balance = None
+        # True when this is the earlier result for a repeated idempotency key
+        self.replayed = False
+
+
+class TransactionPipeline:
+    """The single path for every balance change.
+
+    A transaction is validated and applied to the store's in-memory
+    balances in one synchronous step, then handed to a write-behind
+    buffer. A background thread persists the buffer with one
+    store.append() call every ``flush_interval`` seconds or every
+    ``max_pending`` changes.
+
+    earn() and spend() accept an idempotency ``key`` (the Discord message
+    ID): a key seen within the last ``idempotency_window`` transactions
+    returns the original result, marked ``replayed``, instead of changing
+    the balance again.
+
+    Instrumentation can subscribe to ``on_applied(txn)`` and
+    ``on_flushed(batch, seconds)``; the latter runs on the writer thread.
+    """
+
+    def __init__(self, store, flush_interval=0.5, max_pending=64, idempotency_window=10_000):
+        self.store = store
+        self.on_applied = []
+        self.idempotency_window = idempotency_window
+
+        self._applied = OrderedDict()
+        # Set while a bulk replace() runs; new transactions wait for it
+        self._replacing = None
+        # sync_due() keeps the store's fsync interval honest when it goes quiet
+        self._writer = WriteBehind(store.append, flush_interval, max_pending, tick=store.sync_due)
+
+    @property
+    def on_flushed(self):
+        return self._writer.on_flushed
+
+    async def earn(self, user_id, amount, reason, key=None):
+        if amount <= 0:
+            raise ValueError("earned points must be positive")
+        return await self._submit(Transaction(user_id, amount, reason), key)
+
+    async def spend(self, user_id, amount, reason="spend", key=None):
+        """Deduct points only if the balance covers them (compare-and-deduct).
+
+        Raises InsufficientPoints, with the balance seen, if it doesn't.
+        """
+        if amount <= 0:
+            raise ValueError("spent points must be positive")
+        return await self._submit(Transaction(user_id, -amount, reason), key)
+
+    def balance(self, user_id):
+        return self.store.balances.get(user_id, 0)
+
+    @property
+    def pending(self):
+        return self._writer.pending
+
+    def flush(self):
+        """Write every queued change to the store before returning."""
+        self._writer.flush()
+
+    async def replace(self, balances, before=None):
+        """Set every balance at once (bulk resets) on a worker thread.
+
+        Queued changes are flushed first and ``before()``, e.g. archiving
+        the old totals, runs on the same thread just ahead of the swap.
+        Transactions submitted meanwhile wait for it to finish, so none is
+        lost to the swap.
+        """
+        while self._replacing is not None:
+            await asyncio.shield(self._replacing)
+        loop = asyncio.get_running_loop()
+        self._replacing = loop.create_future()
+        try:
+            await loop.run_in_executor(None, self._replace, balances, before)
+        finally:
+            self._replacing.set_result(None)
+            self._replacing = None
+
+    def _replace(self, balances, before):
+        self._writer.flush()
+        if before is not None:
+            before()
+        self.store.replace(balances)
+
+    def close(self):
+        """Stop the writer thread after a final flush."""
+        self._writer.close()
+
+    async def _submit(self, txn, key=None):
+        self._writer.start()
+        while self._replacing is not None:
+            await asyncio.shield(self._replacing)
+        # Nothing below awaits, so the check-and-apply runs as one step on
+        # the event loop: two commands for the same user can't interleave
+        # and no lock is needed
+        if key is not None and key in self._applied:
+            replay = copy.copy(self._applied[key])
+            replay.replayed = True
+            return replay
+
+        balances = self.store.balances
+        current = balances.get(txn.user_id, 0)
+        if txn.delta < 0 and current < -txn.delta:
+            raise InsufficientPoints(current, -txn.delta)
+
+        txn.balance = current + txn.delta
+        balances[txn.user_id] = txn.balance
+        self._writer.add((txn.user_id, txn.delta, txn.reason))
+        if key is not None:
+            self._remember(key, txn)
+
+        for hook in self.on_applied:
+            hook(txn)
+        return txn
+
+    def _remember(self, key, txn):
+        self._applied[key] = txn
+        if len(self._applied) > self.idempotency_window:
+            self._applied.popitem(last=False)
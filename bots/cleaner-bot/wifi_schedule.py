@@ -0,0 +1,121 @@
+import heapq
+import json
+import logging
+import os
+import time
+
+from atomic_file import write_json
+from timer_heap import TimerHeap
+
+
+logger = logging.getLogger(__name__)
+
+
+class WifiScheduler(TimerHeap):
+    """Persistent "WiFi on until ..." sessions driven by a single timer task.
+
+    Sessions live in a heap ordered by deadline and are mirrored to
+    ``path`` so a restart picks up where it left off. Overlapping sessions
+    merge: the WiFi only goes off when the last deadline has passed.
+
+    ``set_wifi(state)`` is an async callable returning success, and
+    ``notify(channel_id, message)`` is an async callable used for the
+    "time over" announcements.
+    """
+
+    def __init__(self, path, set_wifi, notify):
+        super().__init__()
+        self.path = path
+        self._set_wifi = set_wifi
+        self._notify = notify
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                sessions = [(deadline, label, channel_id) for deadline, label, channel_id in json.load(f)]
+        except (ValueError, TypeError) as e:
+            # A damaged file shouldn't stop the bot; the sessions are lost
+            logger.error(f"ignoring unreadable {self.path}: {e}")
+            return
+        for deadline, label, channel_id in sessions:
+            self._push(deadline, label, channel_id)
+
+    def add(self, deadline, label, channel_id):
+        """Keep the WiFi on until ``deadline`` (a unix timestamp).
+
+        Returns a session id for remove().
+        """
+        session = self._push(deadline, label, channel_id)
+        self._save()
+        self._wake()
+        return session
+
+    def remove(self, session):
+        """Drop a session added with add(), e.g. when the WiFi never came on."""
+        remaining = [entry for entry in self._heap if entry[1] != session]
+        if len(remaining) == len(self._heap):
+            return False
+        heapq.heapify(remaining)
+        self._heap = remaining
+        self._save()
+        self._wake()
+        return True
+
+    @property
+    def session_count(self):
+        return len(self._heap)
+
+    @property
+    def on_until(self):
+        """Unix timestamp the WiFi stays on until, or None if no session."""
+        if not self._heap:
+            return None
+        return max(entry[0] for entry in self._heap)
+
+    def _save(self):
+        data = [[deadline, label, channel_id] for deadline, _, label, channel_id in self._heap]
+        write_json(self.path, data)
+
+    async def _fire(self):
+        expired = []
+        while self._heap and self._heap[0][0] <= time.time():
+            expired.append(heapq.heappop(self._heap))
+        self._save()
+
+        try:
+            await self._expire(expired)
+        except Exception as e:
+            logger.error(f"wifi session expiry failed: {e}")
+
+    async def _expire(self, expired):
+        on_until = self.on_until
+        for _, _, label, channel_id in expired:
+            if on_until is not None:
+                await self._notify(
+                    channel_id,
+                    f"⏰ {label.capitalize()} time over! "
+                    f"WiFi stays on for another session until <t:{int(on_until)}:t>."
+                )
+            else:
+                await self._notify(channel_id, f"⏰ {label.capitalize()} time over! Turning WiFi OFF...")
+
+        if on_until is not None:
+            return
+
+        # A session may have started while the notices were being sent;
+        # check again with no await before the toggle is queued
+        if self._heap:
+            for channel_id in {entry[3] for entry in expired}:
+                await self._notify(
+                    channel_id, f"WiFi stays on for another session until <t:{int(self.on_until)}:t>."
+                )
+            return
+
+        success = await self._set_wifi(False)
+        for channel_id in {entry[3] for entry in expired}:
+            if success:
+                await self._notify(channel_id, "🚫 WiFi is now OFF")
+            else:
+                await self._notify(channel_id, "❌ Failed to turn off WiFi")
@@ -0,0 +1,92 @@
+import logging
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehind:
+    """Buffers changes and hands them to ``write(batch)`` on a background thread.
+
+    A flush happens at most every ``interval`` seconds, or sooner once
+    ``max_pending`` changes are buffered, so disk I/O never runs on the
+    event loop and a burst of changes costs a single write. flush() and
+    close() write synchronously from the calling thread.
+
+    ``tick()``, if given, runs on the thread after every wakeup, busy or
+    not, for periodic work such as a time-based fsync.
+    """
+
+    def __init__(self, write, interval=0.5, max_pending=64, tick=None):
+        self._write = write
+        self._tick = tick
+        self.interval = interval
+        self.max_pending = max_pending
+        self.on_flushed = []
+
+        self._pending = []
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._closed = False
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+            self._thread.start()
+
+    def add(self, change):
+        with self._cond:
+            self._pending.append(change)
+            if len(self._pending) >= self.max_pending:
+                self._cond.notify()
+
+    @property
+    def pending(self):
+        return len(self._pending)
+
+    def flush(self):
+        """Write everything buffered so far before returning."""
+        with self._flush_lock:
+            with self._cond:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return
+
+            started = time.perf_counter()
+            try:
+                self._write(batch)
+            except Exception as e:
+                # Keep the batch so the next flush retries it
+                logger.error(f"write-behind flush failed: {e}")
+                with self._cond:
+                    self._pending = batch + self._pending
+                return
+
+            elapsed = time.perf_counter() - started
+            for hook in self.on_flushed:
+                hook(batch, elapsed)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._closed and len(self._pending) < self.max_pending:
+                    self._cond.wait(self.interval)
+                if self._closed:
+                    return
+            self.flush()
+            if self._tick is not None:
+                try:
+                    self._tick()
+                except Exception as e:
+                    logger.error(f"write-behind tick failed: {e}")
@@ -0,0 +1,132 @@
+"""Parse-time benchmark for the episode list parser.
+
+Times parsing.py's two paths (embedded __NEXT_DATA__ JSON and the DOM
+fallback) per season page, and the old BeautifulSoup + html.parser +
+strptime loop when bs4 is installed, on
+
+  * saved pages, e.g. the scraper's page cache:
+        python bench/bench_parse.py --pages page_cache
+  * or generated fixture pages shaped like IMDb's episode list:
+        python bench/bench_parse.py --seasons 20 --episodes 40
+"""
+import argparse
+import glob
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import parsing  # noqa: E402
+
+
+def fixture_page(season, episodes, rng):
+    """A season page with both the embedded JSON and the rendered cards."""
+    items, cards = [], []
+    day = date(2015, 1, 5) + timedelta(days=rng.randint(0, 3000))
+    for number in range(1, episodes + 1):
+        day += timedelta(days=7)
+        title = f"Episode {number}: {rng.choice(['Hank', 'John', 'Brothers', 'Questions'])}"
+        items.append({
+            "id": f"tt{season:03d}{number:04d}", "type": "tvEpisode",
+            "season": str(season), "episode": str(number), "titleText": title,
+            "releaseDate": {"month": day.month, "day": day.day, "year": day.year, "__typename": "ReleaseDate"},
+            "releaseYear": day.year, "plot": "x" * rng.randint(100, 300),
+        })
+        # Long month names sometimes, like the page does for short months
+        month = day.strftime("%B" if len(day.strftime("%B")) <= 4 else "%b")
+        cards.append(
+            f'<article class="sc-1 episode-item-wrapper"><div class="sc-5372d523-5 jBUStp">'
+            f'<h4><a href="/title/tt{season:03d}{number:04d}/"><div class="ipc-title__text ipc-title__text--reduced">'
+            f'S{season}.E{number} ∙ {title}</div></a></h4>'
+            f'<span class="sc-5372d523-10 knzESm">{day:%a}, {month} {day.day}, {day.year}</span>'
+            f'<div class="plot">{"x" * 200}</div><span class="rating">8.{number % 10}</span></div></article>'
+        )
+    data = {"props": {"pageProps": {"contentData": {"section": {"episodes": {"items": items}}}}}}
+    filler = "".join(f'<div class="nav-{i}"><a href="#">link {i}</a></div>' for i in range(2000))
+    return (
+        f'<html><head><script id="__NEXT_DATA__" type="application/json">{json.dumps(data)}</script></head>'
+        f'<body><h1 class="ipc-title__text">Show</h1>{filler}<section>{"".join(cards)}</section>{filler}</body></html>'
+    )
+
+
+def legacy_parse(html):
+    """The parser hankNjohn.py used before parsing.py."""
+    from bs4 import BeautifulSoup
+    from datetime import datetime
+
+    soup = BeautifulSoup(html, "html.parser")
+    data = []
+    for ep in soup.select("div.sc-5372d523-5.jBUStp"):
+        title_div = ep.select_one("div.ipc-title__text.ipc-title__text--reduced")
+        title = title_div.get_text(strip=True) if title_div else None
+        date_span = ep.select_one("span.sc-5372d523-10.knzESm")
+        date_text = date_span.get_text(strip=True) if date_span else None
+        date_obj = None
+        if date_text:
+            try:
+                date_obj = datetime.strptime(date_text, "%a, %b %d, %Y")
+            except ValueError:
+                try:
+                    date_obj = datetime.strptime(date_text, "%a, %B %d, %Y")
+                except ValueError:
+                    pass
+        data.append({"title": title, "airdate_text": date_text, "airdate": date_obj})
+    return data
+
+
+def time_parser(name, parse, pages, repeat):
+    samples, counts = [], []
+    for _ in range(repeat):
+        for html in pages:
+            started = time.perf_counter()
+            result = parse(html)
+            samples.append(time.perf_counter() - started)
+            counts.append(len(result))
+    print(f"{name:<22} median={1000 * statistics.median(samples):7.2f} ms/page  "
+          f"max={1000 * max(samples):7.2f} ms  episodes/page={statistics.mean(counts):.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", help="directory of saved .html pages")
+    parser.add_argument("--seasons", type=int, default=10, help="fixture pages to generate")
+    parser.add_argument("--episodes", type=int, default=50, help="episodes per fixture page")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.pages:
+        pages = []
+        for path in sorted(glob.glob(os.path.join(args.pages, "*.html"))):
+            with open(path, "r", encoding="utf-8") as f:
+                pages.append(f.read())
+        source = f"{len(pages)} saved pages from {args.pages}"
+    else:
+        rng = random.Random(args.seed)
+        pages = [fixture_page(season, args.episodes, rng) for season in range(1, args.seasons + 1)]
+        source = f"{len(pages)} fixture pages, {args.episodes} episodes each"
+    if not pages:
+        sys.exit("no pages to parse")
+
+    html_parser = "selectolax" if parsing.HTMLParser is not None else "lxml"
+    size = statistics.mean(len(html) for html in pages) / 1024
+    print(f"{source}, {size:.0f} KiB/page, DOM parser: {html_parser}\n")
+
+    time_parser("embedded JSON", parsing.parse_frame, pages, args.repeat)
+    time_parser(f"DOM ({html_parser})", lambda html: parsing.parse_frame(html, use_json=False),
+                pages, args.repeat)
+    try:
+        import bs4  # noqa: F401
+    except ImportError:
+        print("bs4 not installed, skipping the old html.parser baseline")
+    else:
+        time_parser("old bs4 + html.parser", legacy_parse, pages, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
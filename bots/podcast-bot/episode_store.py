@@ -0,0 +1,206 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS episodes (
+    episode_key  TEXT PRIMARY KEY,
+    source       TEXT NOT NULL,
+    title        TEXT,
+    airdate      TEXT,
+    airdate_text TEXT,
+    air_month    INTEGER,
+    updated_at   INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_episodes_airdate
+    ON episodes (airdate);
+CREATE INDEX IF NOT EXISTS idx_episodes_month
+    ON episodes (air_month, airdate);
+CREATE TABLE IF NOT EXISTS pages (
+    url        TEXT PRIMARY KEY,
+    digest     TEXT NOT NULL,
+    fetched_at INTEGER NOT NULL
+);
+"""
+
+COLUMNS = "episode_key, source, title, airdate, airdate_text"
+
+# Only rewrite a row when something about the episode actually changed
+UPSERT_EPISODE = (
+    "INSERT INTO episodes (episode_key, source, title, airdate, airdate_text, air_month, updated_at) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT(episode_key) DO UPDATE SET "
+    "source = excluded.source, title = excluded.title, airdate = excluded.airdate, "
+    "airdate_text = excluded.airdate_text, air_month = excluded.air_month, "
+    "updated_at = excluded.updated_at "
+    "WHERE title IS NOT excluded.title OR airdate IS NOT excluded.airdate "
+    "OR airdate_text IS NOT excluded.airdate_text OR source IS NOT excluded.source"
+)
+UPSERT_PAGE = (
+    "INSERT INTO pages (url, digest, fetched_at) VALUES (?, ?, ?) "
+    "ON CONFLICT(url) DO UPDATE SET digest = excluded.digest, fetched_at = excluded.fetched_at"
+)
+SELECT_DIGEST = "SELECT digest FROM pages WHERE url = ?"
+SELECT_SOURCE_KEYS = "SELECT episode_key FROM episodes WHERE source = ?"
+DELETE_EPISODE = "DELETE FROM episodes WHERE episode_key = ?"
+SELECT_MONTH = f"SELECT {COLUMNS} FROM episodes WHERE air_month = ? ORDER BY airdate"
+SELECT_BETWEEN = f"SELECT {COLUMNS} FROM episodes WHERE airdate BETWEEN ? AND ? ORDER BY airdate"
+SELECT_ALL = f"SELECT {COLUMNS} FROM episodes ORDER BY airdate IS NULL, airdate"
+
+
+def page_digest(html):
+    return hashlib.sha256(html.encode()).hexdigest()
+
+
+def episode_key(source, episode):
+    """IMDb title ID when the parser found one, else the page URL plus title."""
+    return episode.get("id") or f"{source}#{episode.get('title')}"
+
+
+def _iso(value):
+    """ISO date string for a date/datetime/Timestamp, None for missing or NaT."""
+    if value is None or value != value:  # NaT != NaT
+        return None
+    if isinstance(value, datetime):
+        value = value.date()
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)[:10]
+
+
+class EpisodeStore:
+    """Episodes from every scraped season page, persisted in SQLite.
+
+    Each page's SHA-256 is remembered, so a refresh only re-parses pages
+    whose content changed (``changed(url, html)``) and merge() rewrites
+    only the rows that differ. Air dates are stored as ISO strings with an
+    index on them and on the month, so month and date-range queries never
+    scan the table. The connection is shared between threads behind a lock.
+    """
+
+    def __init__(self, path="episodes.db"):
+        self.path = path
+        self._db = None
+        self._lock = threading.Lock()
+
+    def open(self):
+        self._db = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        return self
+
+    def changed(self, url, html):
+        """True if ``html`` differs from the last version merged for ``url``."""
+        with self._lock:
+            row = self._db.execute(SELECT_DIGEST, (url,)).fetchone()
+        return row is None or row[0] != page_digest(html)
+
+    def merge(self, url, html, episodes):
+        """Replace the episodes that came from ``url`` with ``episodes``.
+
+        ``episodes`` are dicts with title, airdate_text, airdate and
+        optionally id. Unchanged rows are left alone and episodes no longer
+        on the page are dropped. Returns the number of rows written or
+        deleted.
+        """
+        now = int(time.time())
+        rows = {}
+        for episode in episodes:
+            airdate = _iso(episode.get("airdate"))
+            rows[episode_key(url, episode)] = (
+                url, episode.get("title"), airdate, episode.get("airdate_text"),
+                int(airdate[5:7]) if airdate else None, now,
+            )
+
+        with self._lock, _Transaction(self._db):
+            before = self._db.total_changes
+            self._db.executemany(UPSERT_EPISODE, [(key, *row) for key, row in rows.items()])
+            stale = [
+                (key,) for (key,) in self._db.execute(SELECT_SOURCE_KEYS, (url,)).fetchall()
+                if key not in rows
+            ]
+            self._db.executemany(DELETE_EPISODE, stale)
+            written = self._db.total_changes - before
+            self._db.execute(UPSERT_PAGE, (url, page_digest(html), now))
+        return written
+
+    def in_month(self, month, year=None):
+        """Episodes that aired in ``month`` (1-12), optionally of one year."""
+        if year is not None:
+            start = date(year, month, 1)
+            end = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+            return self.between(start, end)
+        with self._lock:
+            return self._db.execute(SELECT_MONTH, (month,)).fetchall()
+
+    def between(self, start, end):
+        """Episodes that aired from ``start`` to ``end`` inclusive (dates or ISO strings)."""
+        with self._lock:
+            return self._db.execute(SELECT_BETWEEN, (_iso(start), _iso(end))).fetchall()
+
+    def all(self):
+        """Every episode, oldest first, undated ones last."""
+        with self._lock:
+            return self._db.execute(SELECT_ALL).fetchall()
+
+    def close(self):
+        with self._lock:
+            if self._db is None:
+                return
+            self._db.close()
+            self._db = None
+
+
+class _Transaction:
+    """BEGIN/COMMIT around a block, ROLLBACK if it raises."""
+
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        self.db.execute("BEGIN")
+
+    def __exit__(self, exc_type, exc, tb):
+        self.db.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
+
+
+class EpisodeIndex:
+    """Read-only in-memory copy of the store for the bot's commands.
+
+    Rows are kept sorted by air date with the dates in a parallel list, so
+    a date range is two bisects and a month is a dict lookup. A refresh
+    builds a new index and swaps it in; an index is never modified.
+    """
+
+    def __init__(self, rows=()):
+        dated = sorted((row for row in rows if row[3]), key=lambda row: row[3])
+        self.rows = dated
+        self.undated = [row for row in rows if not row[3]]
+        self._dates = [row[3] for row in dated]
+        self._months = {}
+        for row in dated:
+            self._months.setdefault(int(row[3][5:7]), []).append(row)
+
+    def in_month(self, month, year=None):
+        if year is not None:
+            start = date(year, month, 1)
+            end = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+            return self.between(start, end)
+        return self._months.get(month, [])
+
+    def between(self, start, end):
+        return self.rows[bisect_left(self._dates, _iso(start)):bisect_right(self._dates, _iso(end))]
+
+    def latest(self, count=5, today=None):
+        """The ``count`` most recent episodes that aired by ``today``."""
+        stop = bisect_right(self._dates, _iso(today or date.today()))
+        return self.rows[max(0, stop - count):stop][::-1]
+
+    def __len__(self):
+        return len(self.rows) + len(self.undated)
@@ -1,55 +1,52 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from bs4 import BeautifulSoup
+import argparse
+import logging
 import pandas as pd
-from datetime import datetime
-
-url = "https://www.imdb.com/title/tt16845574/episodes/?season=Unknown&ref_=ttep_ep_sn_nx"
-
-# Selenium setup
-options = Options()
-options.add_argument("--headless")
-driver = webdriver.Chrome(options=options)  # Make sure chromedriver is in PATH
-driver.get(url)
-
-html = driver.page_source
-driver.quit()
-
-soup = BeautifulSoup(html, "html.parser")
-
-# Each episode container
-episodes = soup.select("div.sc-5372d523-5.jBUStp")
-
-data = []
-for ep in episodes:
-    # Get title
-    title_div = ep.select_one("div.ipc-title__text.ipc-title__text--reduced")
-    title = title_div.get_text(strip=True) if title_div else None
-
-    # Get air date
-    date_span = ep.select_one("span.sc-5372d523-10.knzESm")
-    date_text = date_span.get_text(strip=True) if date_span else None
-
-    # Convert to datetime
-    date_obj = None
-    if date_text:
-        try:
-            date_obj = datetime.strptime(date_text, "%a, %b %d, %Y")  # e.g., "Mon, Jun 8, 2015"
-        except ValueError:
-            try:
-                date_obj = datetime.strptime(date_text, "%a, %B %d, %Y")
-            except:
-                pass
-
-    data.append({"title": title, "airdate_text": date_text, "airdate": date_obj})
-
-# Create DataFrame
-df = pd.DataFrame(data)
-
-# Filter November episodes
-november_df = df[df["airdate"].notna() & (df["airdate"].dt.month == 11)]
-
-print(november_df[["title", "airdate_text", "airdate"]])
-
-# Optional: save to CSV
-# november_df.to_csv("november_episodes.csv", index=False)
+from scraper import DEFAULT_URLS, PageCache, Scraper
+from episode_store import EpisodeStore
+from parsing import parse_episodes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Update the episode index and list November episodes.")
+    parser.add_argument("urls", nargs="*", default=DEFAULT_URLS, help="IMDb episode list URLs")
+    parser.add_argument("--workers", type=int, default=4, help="pages fetched at once")
+    parser.add_argument("--mode", choices=["auto", "http", "browser"], default="auto",
+                        help="plain HTTP, headless Chrome, or HTTP with a Chrome fallback")
+    parser.add_argument("--cache-dir", default="page_cache")
+    parser.add_argument("--ttl", type=float, default=6, help="hours a cached page stays fresh")
+    parser.add_argument("--db", default="episodes.db", help="episode index (SQLite)")
+    parser.add_argument("--month", type=int, default=11, help="month to list (1-12)")
+    parser.add_argument("--csv", help="also save the listed episodes to this CSV file")
+    parser.add_argument("--no-fetch", action="store_true", help="only query the saved index")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+
+    store = EpisodeStore(args.db).open()
+    try:
+        if not args.no_fetch:
+            cache = PageCache(args.cache_dir, ttl=args.ttl * 3600)
+            with Scraper(cache, workers=args.workers, mode=args.mode) as scraper:
+                pages = scraper.fetch_all(args.urls)
+
+            # Only pages whose content changed since the last run are parsed
+            for url, html in pages.items():
+                if store.changed(url, html):
+                    written = store.merge(url, html, parse_episodes(html))
+                    logging.info(f"{url}: {written} episode rows updated")
+
+        # Served from the air date index, no re-scrape or full scan
+        rows = store.in_month(args.month)
+    finally:
+        store.close()
+
+    df = pd.DataFrame(rows, columns=["key", "source", "title", "airdate", "airdate_text"])
+    df["airdate"] = pd.to_datetime(df["airdate"])
+
+    print(df[["title", "airdate_text", "airdate"]])
+
+    if args.csv:
+        df.to_csv(args.csv, index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+import json
+import re
+
+import pandas as pd
+
+# selectolax is the fastest HTML parser available; lxml is the fallback.
+# selectolax 1.0 moved to the lexbor backend and dropped selectolax.parser
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser
+    except ImportError:
+        HTMLParser = None
+import lxml.html
+
+
+# Next.js pages carry their data as JSON in this script tag; reading it
+# skips the DOM (and its hashed CSS class names) entirely
+NEXT_DATA = re.compile(r'<script[^>]*\bid="__NEXT_DATA__"[^>]*>(.*?)</script>', re.S)
+
+# "Mon, Jun 8, 2015" or "Sat, November 9, 2024"
+DATE_TEXT = re.compile(r"^(?:[A-Za-z]{3,},\s*)?[A-Za-z]{3,}\.? \d{1,2}, \d{4}$")
+EPISODE_TITLE = re.compile(r"^S\d+\.E\d+")
+
+TITLE_CLASS = "ipc-title__text"
+HAS_TITLE_CLASS = f"[contains(concat(' ', normalize-space(@class), ' '), ' {TITLE_CLASS} ')]"
+
+COLUMNS = ["id", "title", "airdate_text", "airdate"]
+
+
+def parse_episodes(html):
+    """Episodes on an IMDb episode list page, as dicts with id, title,
+    airdate_text and airdate (a Timestamp, or None when unknown)."""
+    df = parse_frame(html)
+    df = df.astype(object).where(df.notna(), None)
+    return df.to_dict("records")
+
+
+def parse_frame(html, use_json=True):
+    """Same as parse_episodes, as a DataFrame with COLUMNS.
+
+    Reads the embedded page data when there is any (unless ``use_json`` is
+    False), otherwise the episode cards in the HTML.
+    """
+    items = next_data_episodes(html) if use_json else None
+    if items is not None:
+        return _frame_from_json(items)
+    return _frame_from_dom(html)
+
+
+# ---------------------------
+# Embedded page data
+# ---------------------------
+
+def next_data_episodes(html):
+    """The episode items from the page's __NEXT_DATA__ JSON, or None."""
+    match = NEXT_DATA.search(html)
+    if match is None:
+        return None
+    try:
+        data = json.loads(match.group(1))
+    except ValueError:
+        return None
+    return _find_episode_list(data)
+
+
+def _find_episode_list(node):
+    # Search for the list instead of hard-coding its path, which IMDb moves
+    # around between redesigns
+    if isinstance(node, list):
+        if node and all(isinstance(item, dict) and "titleText" in item
+                        and ("releaseDate" in item or "episode" in item) for item in node):
+            return node
+        children = node
+    elif isinstance(node, dict):
+        children = node.values()
+    else:
+        return None
+    for child in children:
+        found = _find_episode_list(child)
+        if found is not None:
+            return found
+    return None
+
+
+def _text(value):
+    if isinstance(value, dict):
+        return value.get("text")
+    return value
+
+
+def _frame_from_json(items):
+    rows = []
+    for item in items:
+        title = _text(item.get("titleText"))
+        if item.get("season") and item.get("episode"):
+            title = f"S{item['season']}.E{item['episode']} ∙ {title}"
+        released = item.get("releaseDate") or {}
+        rows.append((item.get("id"), title, released.get("year"), released.get("month"), released.get("day")))
+
+    df = pd.DataFrame(rows, columns=["id", "title", "year", "month", "day"])
+    parts = df[["year", "month", "day"]].apply(pd.to_numeric, errors="coerce")
+    # One vectorized pass; rows missing a part become NaT
+    df["airdate"] = pd.to_datetime(parts, errors="coerce")
+    # Same "Mon, Jun 8, 2015" form the page shows
+    df["airdate_text"] = [
+        f"{date:%a, %b} {date.day}, {date.year}" if pd.notna(date) else None
+        for date in df["airdate"]
+    ]
+    return df[COLUMNS]
+
+
+# ---------------------------
+# DOM fallback
+# ---------------------------
+
+def _frame_from_dom(html):
+    rows = _dom_rows_selectolax(html) if HTMLParser is not None else _dom_rows_lxml(html)
+    df = pd.DataFrame(rows, columns=["title", "airdate_text"])
+    df.insert(0, "id", None)
+    df["airdate"] = parse_dates(df["airdate_text"])
+    return df[COLUMNS]
+
+
+def _episode_row(title, card, parent, span_texts, title_count):
+    """(title, date text) if ``title`` sits in an episode card, else None.
+
+    Climbs at most six levels from the title to the first ancestor holding
+    a date-like span (or an <article>), instead of relying on IMDb's
+    hashed class names. It never climbs into a node holding other titles,
+    so an undated episode can't pick up its neighbour's date.
+    """
+    date_text = None
+    for _ in range(6):
+        if card is None or title_count(card) > 1:
+            break
+        date_text = next((text for text in span_texts(card) if DATE_TEXT.match(text)), None)
+        if date_text is not None or card.tag == "article":
+            break
+        card = parent(card)
+    if date_text is None and not EPISODE_TITLE.match(title):
+        return None
+    return title, date_text
+
+
+def _dom_rows_selectolax(html):
+    rows = []
+    for node in HTMLParser(html).css(f".{TITLE_CLASS}"):
+        row = _episode_row(
+            node.text(strip=True), node.parent, lambda card: card.parent,
+            lambda card: [span.text(strip=True) for span in card.css("span")],
+            lambda card: len(card.css(f".{TITLE_CLASS}")),
+        )
+        if row is not None:
+            rows.append(row)
+    return rows
+
+
+def _dom_rows_lxml(html):
+    rows = []
+    tree = lxml.html.fromstring(html)
+    for node in tree.xpath(f"//*{HAS_TITLE_CLASS}"):
+        row = _episode_row(
+            node.text_content().strip(), node.getparent(), lambda card: card.getparent(),
+            lambda card: [span.text_content().strip() for span in card.iter("span")],
+            lambda card: len(card.xpath(f".//*{HAS_TITLE_CLASS}")),
+        )
+        if row is not None:
+            rows.append(row)
+    return rows
+
+
+def parse_dates(texts):
+    """Vectorized "Mon, Jun 8, 2015" / "Sat, November 9, 2024" parsing.
+
+    Drops the weekday and cuts the month to three letters, so one format
+    covers both spellings; anything else becomes NaT.
+    """
+    cleaned = (
+        pd.Series(texts, dtype="string")
+        .str.replace(r"^[A-Za-z]{3,},\s*", "", regex=True)
+        .str.replace(r"^([A-Za-z]{3})[A-Za-z]*\.?", r"\1", regex=True)
+    )
+    return pd.to_datetime(cleaned, format="%b %d, %Y", errors="coerce")
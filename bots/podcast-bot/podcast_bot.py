@@ -0,0 +1,213 @@
+import discord
+from discord.ext import commands, tasks
+import asyncio
+import calendar
+import logging
+import os
+import time
+from datetime import date
+from dotenv import load_dotenv
+from scraper import DEFAULT_URLS, PageCache, Scraper
+from episode_store import EpisodeStore, EpisodeIndex
+
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------
+# Configuration
+# ---------------------------
+# Read when the bot starts:
+#   PODCAST_URLS: comma separated IMDb season pages (defaults to DEFAULT_URLS)
+#   REFRESH_HOURS: how often the episode index is re-scraped
+#   SCRAPE_MODE: "auto", "http" or "browser" (see scraper.Scraper)
+
+EPISODES_DB = "episodes.db"
+PAGE_CACHE_DIR = "page_cache"
+
+# Discord rejects messages over 2000 characters
+MESSAGE_LIMIT = 2000
+
+MONTHS = {name.lower(): number for number, name in enumerate(calendar.month_name) if name}
+MONTHS.update({name.lower(): number for number, name in enumerate(calendar.month_abbr) if name})
+
+
+# ---------------------------
+# Episode index
+# ---------------------------
+
+class Episodes:
+    """The episode store plus the in-memory index commands read from.
+
+    refresh() does all the slow work (fetching, parsing, SQLite) and is
+    meant to run on a worker thread; it finishes by swapping in a new
+    EpisodeIndex, so commands only ever read a complete index.
+    """
+
+    def __init__(self, urls, refresh_hours, mode="auto"):
+        self.urls = urls
+        self.refresh_hours = refresh_hours
+        self.mode = mode
+        self.store = EpisodeStore(EPISODES_DB)
+        self.cache = None
+        self.index = EpisodeIndex()
+        self.refreshed_at = None
+
+    def open(self):
+        """Open the store and serve whatever it already holds."""
+        self.store.open()
+        # Pages stay cached a little under one interval, so every refresh
+        # re-fetches but a restart in between doesn't
+        self.cache = PageCache(PAGE_CACHE_DIR, ttl=self.refresh_hours * 3600 * 0.9)
+        self.index = EpisodeIndex(self.store.all())
+
+    def refresh(self):
+        from parsing import parse_episodes  # pandas is only needed here
+
+        started = time.perf_counter()
+        with Scraper(self.cache, mode=self.mode) as scraper:
+            pages = scraper.fetch_all(self.urls)
+
+        written = 0
+        for url, html in pages.items():
+            if self.store.changed(url, html):
+                written += self.store.merge(url, html, parse_episodes(html))
+
+        self.index = EpisodeIndex(self.store.all())
+        self.refreshed_at = int(time.time())
+        logger.info(
+            f"episode refresh: {len(pages)}/{len(self.urls)} pages, {written} rows changed, "
+            f"{len(self.index)} episodes in {time.perf_counter() - started:.1f}s"
+        )
+
+    def close(self):
+        self.store.close()
+
+
+# ---------------------------
+# Bot Setup
+# ---------------------------
+
+class PodcastBot(commands.Bot):
+    def __init__(self, episodes, refresh_hours, **kwargs):
+        super().__init__(**kwargs)
+        self.episodes = episodes
+        self._refresh_lock = asyncio.Lock()
+        refresh_loop.change_interval(hours=refresh_hours)
+
+    async def setup_hook(self):
+        await asyncio.get_running_loop().run_in_executor(None, self.episodes.open)
+        refresh_loop.start(self)
+
+    async def close(self):
+        refresh_loop.cancel()
+        await asyncio.get_running_loop().run_in_executor(None, self.episodes.close)
+        await super().close()
+
+    async def refresh(self):
+        """Run a refresh on a worker thread; concurrent calls share one run."""
+        if self._refresh_lock.locked():
+            async with self._refresh_lock:
+                return
+        async with self._refresh_lock:
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, self.episodes.refresh)
+            except Exception as e:
+                logger.error(f"episode refresh failed: {e}")
+
+
+@tasks.loop(hours=6)
+async def refresh_loop(bot):
+    await bot.refresh()
+
+
+# ---------------------------
+# Commands
+# ---------------------------
+
+def format_episodes(heading, rows):
+    lines = [f"**{heading}** ({len(rows)})"]
+    for _, _, title, airdate, _ in rows:
+        lines.append(f"• {airdate} — {title}")
+    message = "\n".join(lines)
+    if len(message) > MESSAGE_LIMIT:
+        message = message[:MESSAGE_LIMIT - 20].rsplit("\n", 1)[0] + "\n…and more"
+    return message
+
+
+@commands.command(help="Episodes by month or date range: !episodes november [2024], !episodes 2024-01-01 2024-03-31")
+async def episodes(ctx, first: str, second: str = None):
+    index = ctx.bot.episodes.index
+    month = MONTHS.get(first.lower()) or (int(first) if first.isdigit() and 1 <= int(first) <= 12 else None)
+
+    try:
+        if month is not None:
+            year = int(second) if second else None
+            rows = index.in_month(month, year)
+            heading = f"{calendar.month_name[month]}{f' {year}' if year else ''} episodes"
+        else:
+            start = date.fromisoformat(first)
+            end = date.fromisoformat(second) if second else date.today()
+            rows = index.between(start, end)
+            heading = f"Episodes {start} to {end}"
+    except ValueError:
+        await ctx.send("❌ Use a month (`!episodes november`, `!episodes 11 2024`) "
+                       "or dates (`!episodes 2024-01-01 2024-03-31`).")
+        return
+
+    if not rows:
+        await ctx.send(f"No episodes found for that period ({len(index)} indexed).")
+        return
+    await ctx.send(format_episodes(heading, rows))
+
+
+@commands.command(help="The most recently aired episodes.")
+async def latest(ctx, count: int = 5):
+    rows = ctx.bot.episodes.index.latest(max(1, min(count, 25)))
+    if not rows:
+        await ctx.send("No episodes indexed yet.")
+        return
+    await ctx.send(format_episodes("Latest episodes", rows))
+
+
+@commands.command(help="Re-scrape the episode pages now (admin).")
+@commands.has_permissions(administrator=True)
+async def refresh(ctx):
+    await ctx.send("🔄 Refreshing the episode index…")
+    await ctx.bot.refresh()
+    refreshed_at = ctx.bot.episodes.refreshed_at
+    when = f"<t:{refreshed_at}:R>" if refreshed_at else "never"
+    await ctx.send(f"✅ {len(ctx.bot.episodes.index)} episodes indexed (last refresh {when}).")
+
+
+# ---------------------------
+# Run Bot
+# ---------------------------
+
+def create_bot():
+    """Build the bot from the environment. Connects to nothing."""
+    urls = [url.strip() for url in os.getenv("PODCAST_URLS", "").split(",") if url.strip()] or DEFAULT_URLS
+    refresh_hours = float(os.getenv("REFRESH_HOURS", "6"))
+
+    intents = discord.Intents.default()
+    intents.message_content = True
+
+    bot = PodcastBot(
+        Episodes(urls, refresh_hours, os.getenv("SCRAPE_MODE", "auto")),
+        refresh_hours, command_prefix="!", intents=intents,
+    )
+    for command in (episodes, latest, refresh):
+        bot.add_command(command)
+    return bot
+
+
+def main():
+    load_dotenv()
+    logging.getLogger("discord").setLevel(logging.WARNING)
+    bot = create_bot()
+    # root_logger=True puts discord.py's handler on the root logger, so our
+    # own INFO lines (refresh summaries, failures) are formatted and shown
+    bot.run(os.getenv("DISCORD_TOKEN"), root_logger=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import requests
+
+
+logger = logging.getLogger(__name__)
+
+# Season pages scraped when no list is given
+DEFAULT_URLS = ["https://www.imdb.com/title/tt16845574/episodes/?season=Unknown&ref_=ttep_ep_sn_nx"]
+
+# IMDb serves the full episode list (with its embedded page data) to a
+# normal browser user agent, so most pages never need Chrome
+HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+    ),
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+
+class PageCache:
+    """Raw pages on disk, one file per URL, reused for ``ttl`` seconds.
+
+    Files are named by the SHA-256 of the URL and written through a temp
+    file and a rename, so a crash never leaves a half-written page.
+    """
+
+    def __init__(self, directory="page_cache", ttl=6 * 3600):
+        self.directory = directory
+        self.ttl = ttl
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, url):
+        return os.path.join(self.directory, hashlib.sha256(url.encode()).hexdigest() + ".html")
+
+    def get(self, url):
+        """The cached page, or None if missing or older than the TTL."""
+        path = self.path(url)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl:
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def put(self, url, html):
+        path = self.path(url)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(html)
+        os.replace(tmp_path, path)
+
+
+class DriverPool:
+    """Up to ``size`` headless Chrome instances, started on demand and reused.
+
+    Starting Chrome takes seconds, so a driver is handed back to the pool
+    after each page instead of being quit. Selenium is only imported once
+    the first driver is needed.
+    """
+
+    def __init__(self, size=2):
+        self.size = size
+        self._idle = []
+        self._all = []
+        self._starting = 0
+        # Signalled whenever a driver is handed back or a slot frees up
+        self._cond = threading.Condition()
+
+    @contextmanager
+    def driver(self):
+        driver = self._acquire()
+        try:
+            yield driver
+        except Exception:
+            # A crashed page can leave the browser unusable; replace it
+            self._discard(driver)
+            raise
+        else:
+            with self._cond:
+                self._idle.append(driver)
+                self._cond.notify()
+
+    def close(self):
+        with self._cond:
+            drivers, self._all, self._idle = self._all, [], []
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception as e:
+                logger.warning(f"chrome quit failed: {e}")
+
+    def _acquire(self):
+        with self._cond:
+            while True:
+                if self._idle:
+                    return self._idle.pop()
+                if len(self._all) + self._starting < self.size:
+                    self._starting += 1  # reserve the slot
+                    break
+                # Woken by a returned driver or by a discarded one freeing
+                # its slot, in which case we start the replacement
+                self._cond.wait()
+
+        try:
+            driver = self._start_driver()
+        except Exception:
+            with self._cond:
+                self._starting -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._starting -= 1
+            self._all.append(driver)
+        return driver
+
+    def _discard(self, driver):
+        with self._cond:
+            if driver in self._all:
+                self._all.remove(driver)
+            self._cond.notify()
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def _start_driver(self):
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+
+        options = Options()
+        options.add_argument("--headless=new")
+        options.add_argument("--disable-gpu")
+        options.add_argument("--no-sandbox")
+        options.add_argument(f"--user-agent={HEADERS['User-Agent']}")
+        return webdriver.Chrome(options=options)  # Make sure chromedriver is in PATH
+
+
+class Scraper:
+    """Fetches episode list pages concurrently, through the disk cache.
+
+    ``mode`` is "http" (plain requests only), "browser" (always Chrome) or
+    "auto": plain HTTP first, Chrome only when the request fails or the
+    page came back without ``required`` in it (a bot check, for example).
+    """
+
+    def __init__(self, cache=None, workers=4, mode="auto", browsers=2, timeout=20,
+                 required="__NEXT_DATA__"):
+        self.cache = cache
+        self.workers = workers
+        self.mode = mode
+        self.timeout = timeout
+        self.required = required
+        self.pool = DriverPool(browsers)
+        self._local = threading.local()
+
+    def fetch(self, url):
+        """The page at ``url``, from the cache when it is fresh enough."""
+        if self.cache is not None:
+            html = self.cache.get(url)
+            if html is not None:
+                return html
+
+        html = None
+        if self.mode != "browser":
+            try:
+                html = self._fetch_http(url)
+            except requests.RequestException as e:
+                if self.mode == "http":
+                    raise
+                logger.warning(f"{url}: HTTP fetch failed ({e}), trying Chrome")
+            if html is not None and self.mode == "auto" and self.required not in html:
+                logger.info(f"{url}: page data missing over HTTP, trying Chrome")
+                html = None
+        if html is None:
+            html = self._fetch_browser(url)
+
+        if self.cache is not None:
+            self.cache.put(url, html)
+        return html
+
+    def fetch_all(self, urls):
+        """Fetch every URL in parallel. Returns {url: html}; failures are left out."""
+        urls = list(dict.fromkeys(urls))
+        pages = {}
+        with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(urls)))) as executor:
+            futures = {url: executor.submit(self.fetch, url) for url in urls}
+            for url, future in futures.items():
+                try:
+                    pages[url] = future.result()
+                except Exception as e:
+                    logger.error(f"{url}: fetch failed: {e}")
+        return pages
+
+    def close(self):
+        self.pool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _fetch_http(self, url):
+        # requests sessions keep connections alive; one per worker thread
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+            session.headers.update(HEADERS)
+        response = session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        if "charset" not in response.headers.get("Content-Type", ""):
+            response.encoding = "utf-8"  # requests would assume Latin-1
+        return response.text
+
+    def _fetch_browser(self, url):
+        with self.pool.driver() as driver:
+            driver.set_page_load_timeout(self.timeout)
+            driver.get(url)
+            return driver.page_source